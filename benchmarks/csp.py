@@ -0,0 +1,318 @@
+#Constraining Order - a simple constraint satisfaction library
+#
+#Copyright (c) 2015 Johannes Reinhardt <jreinhardt@ist-dein-freund.de>
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+"""
+Benchmarks of the solution methods on standard CSP families.
+
+Every instance is solved with every solution method of
+:func:`~constrainingorder.solver.solve`. The wall time, the number of
+assignments, the number of solutions and the peak memory are written to a
+JSON file, and compared against a baseline. The run fails if the time or
+memory grow by more than the tolerance, if more assignments are needed, or
+if the number of solutions changes.
+
+Run from the root of the repository::
+
+    python benchmarks/csp.py --output results.json
+    python benchmarks/csp.py --save-baseline
+"""
+from __future__ import print_function
+import sys
+import json
+import argparse
+import platform
+import tracemalloc
+from os import path
+from time import perf_counter
+from random import Random
+from itertools import product, combinations
+
+here = path.dirname(path.abspath(__file__))
+sys.path.insert(0,path.join(here,'..','src'))
+
+from constrainingorder import Space
+from constrainingorder.solver import solve, propagate, Budget, Statistics
+from constrainingorder.sets import DiscreteSet
+from constrainingorder.variables import DiscreteVariable
+from constrainingorder.constraints import Constraint, AllDifferent, \
+    FixedValue, NonEqual, Less, DiscreteBinaryRelation
+
+METHODS = ['backtrack','backjump','forward-check','ac-lookahead']
+
+BASELINE = path.join(here,'baseline.json')
+
+class QueensConstraint(Constraint):
+    """
+    Constraint that ensures that a number of queens on a chessboard can not
+    attack each other, as in the custom constraints tutorial
+    """
+    consistent_implies_satisfied = True
+
+    def __init__(self,queens):
+        Constraint.__init__(self,dict((var,var.domain) for var in queens))
+    def _conflict(self,val1,val2):
+        if val1[0] == val2[0]:
+            return True
+        if val1[0] - val1[1] == val2[0] - val2[1]:
+            return True
+        if val1[0] + val1[1] == val2[0] + val2[1]:
+            return True
+    def satisfied(self,lab):
+        for v1,v2 in product(self.vnames,repeat=2):
+            if v1 == v2:
+                continue
+            if v1 not in lab or v2 not in lab:
+                return False
+            if self._conflict(lab[v1],lab[v2]):
+                return False
+        return True
+    def consistent(self,lab):
+        for v1,v2 in product(self.vnames,repeat=2):
+            if v1 not in lab or v2 not in lab or v1 == v2:
+                continue
+            if self._conflict(lab[v1],lab[v2]):
+                return False
+        return True
+
+def queens(n):
+    """
+    n queens with one n-ary constraint, all solutions
+    """
+    variables = []
+    for i in range(n):
+        domain = DiscreteSet([(j,i) for j in range(n)])
+        variables.append(DiscreteVariable('q%d' % i,domain=domain))
+    return Space(variables,[QueensConstraint(variables)]), {}
+
+SUDOKU = [
+    '125894736',
+    '63..5.9..',
+    '.9...35..',
+    '...2..6.3',
+    '3.2...1.7',
+    '9.8..6...',
+    '..65...7.',
+    '..9.6..25',
+    '.....8..9',
+]
+
+def sudoku():
+    """
+    the sudoku from the quickstart with the first row filled in, so that
+    plain backtracking finishes quickly, reduced by arc consistency and
+    solved with the mrv heuristic
+    """
+    numbers = range(1,10)
+    variables = {}
+    for i, j in product(numbers,repeat=2):
+        name = 'x%d%d' % (i,j)
+        variables[name] = DiscreteVariable(name,domain=DiscreteSet(numbers))
+    cons = []
+    for i in numbers:
+        cons.append(AllDifferent([variables['x%d%d' % (i,j)] for j in numbers]))
+        cons.append(AllDifferent([variables['x%d%d' % (j,i)] for j in numbers]))
+    for i, j in product(range(3),repeat=2):
+        names = ['x%d%d' % (3*i + k + 1,3*j + l + 1)
+                 for k, l in product(range(3),repeat=2)]
+        cons.append(AllDifferent([variables[n] for n in names]))
+    for i, row in enumerate(SUDOKU):
+        for j, char in enumerate(row):
+            if char != '.':
+                var = variables['x%d%d' % (i+1,j+1)]
+                cons.append(FixedValue(var,int(char)))
+    space = Space(variables.values(),cons)
+    propagate(space)
+    return space, {'ordering' : 'mrv'}
+
+def colouring(n,density,colours,seed):
+    """
+    colouring of a random graph, first solution
+    """
+    rng = Random(seed)
+    variables = [DiscreteVariable('v%d' % i,domain=DiscreteSet(range(colours)))
+                 for i in range(n)]
+    cons = []
+    for v1, v2 in combinations(variables,2):
+        if rng.random() < density:
+            cons.append(NonEqual(v1,v2))
+    return Space(variables,cons), {'limit' : 1}
+
+def jobshop(jobs,tasks,horizon,seed):
+    """
+    job-shop like scheduling: the tasks of a job are ordered by Less
+    chains, and tasks on the same machine need different start times.
+    First solution.
+    """
+    rng = Random(seed)
+    variables = []
+    cons = []
+    machines = {}
+    for i in range(jobs):
+        chain = []
+        for j in range(tasks):
+            var = DiscreteVariable('t%d_%d' % (i,j),
+                                   domain=DiscreteSet(range(horizon)))
+            chain.append(var)
+            machines.setdefault(rng.randrange(tasks),[]).append(var)
+        variables.extend(chain)
+        for v1, v2 in zip(chain[:-1],chain[1:]):
+            cons.append(Less(v1,v2))
+    for machine in sorted(machines):
+        for v1, v2 in combinations(machines[machine],2):
+            cons.append(NonEqual(v1,v2))
+    return Space(variables,cons), {'limit' : 1}
+
+def random_binary(n,d,density,tightness,seed):
+    """
+    random binary CSP in model B, all solutions. The instances are hardest
+    close to the phase transition, where about one solution is expected.
+    """
+    rng = Random(seed)
+    variables = [DiscreteVariable('v%d' % i,domain=DiscreteSet(range(d)))
+                 for i in range(n)]
+    pairs = list(combinations(variables,2))
+    cons = []
+    for v1, v2 in rng.sample(pairs,int(round(density*len(pairs)))):
+        tuples = list(product(range(d),repeat=2))
+        forbidden = int(round(tightness*len(tuples)))
+        allowed = rng.sample(tuples,len(tuples) - forbidden)
+        cons.append(DiscreteBinaryRelation(v1,v2,allowed))
+    return Space(variables,cons), {}
+
+INSTANCES = [
+    ('queens-6', lambda: queens(6)),
+    ('queens-8', lambda: queens(8)),
+    ('queens-9', lambda: queens(9)),
+    ('sudoku', sudoku),
+    ('colouring-25', lambda: colouring(25,0.15,3,2)),
+    ('jobshop-6x5', lambda: jobshop(6,5,12,1)),
+    ('random-16-5', lambda: random_binary(16,5,0.3,0.5,2)),
+]
+
+def run(build,method,repeat):
+    """
+    Solve an instance with a method
+
+    returns a dictionary with the best time of repeat runs, and the nodes,
+    solutions and peak memory of a separate run
+    """
+    times = []
+    for i in range(repeat):
+        space, options = build()
+        budget = Budget(limit=options.get('limit'))
+        start = perf_counter()
+        for label in solve(space,method,ordering=options.get('ordering'),
+                           budget=budget):
+            pass
+        times.append(perf_counter() - start)
+
+    space, options = build()
+    budget = Budget(limit=options.get('limit'))
+    stats = Statistics()
+    tracemalloc.start()
+    for label in solve(space,method,ordering=options.get('ordering'),
+                       budget=budget,stats=stats):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'time' : min(times),
+        'nodes' : stats.nodes,
+        'solutions' : stats.solutions,
+        'peak_memory' : peak,
+    }
+
+def compare(results,baseline,tolerance):
+    """
+    Compare results against a baseline
+
+    returns a list of messages describing the regressions
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        if not key in baseline:
+            continue
+        base = baseline[key]
+        if result['solutions'] != base['solutions']:
+            regressions.append('%s: %d solutions instead of %d' %
+                               (key,result['solutions'],base['solutions']))
+        if result['nodes'] > base['nodes']:
+            regressions.append('%s: %d nodes instead of %d' %
+                               (key,result['nodes'],base['nodes']))
+        #small absolute changes are noise
+        for field, slack in [('time',0.005),('peak_memory',4096)]:
+            if result[field] > base[field]*(1 + tolerance) + slack:
+                regressions.append('%s: %s %g instead of %g' %
+                                   (key,field,result[field],base[field]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--output',help='file to write the results to')
+    parser.add_argument('--baseline',default=BASELINE,
+                        help='baseline to compare against')
+    parser.add_argument('--save-baseline',action='store_true',
+                        help='store the results as new baseline')
+    parser.add_argument('--repeat',type=int,default=3,
+                        help='number of timed runs per instance and method')
+    parser.add_argument('--tolerance',type=float,default=0.5,
+                        help='allowed relative growth of time and memory')
+    parser.add_argument('--filter',default='',
+                        help='only run instances containing this string')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, build in INSTANCES:
+        if not args.filter in name:
+            continue
+        for method in METHODS:
+            key = '%s/%s' % (name,method)
+            results[key] = run(build,method,args.repeat)
+            print('%-32s %10.4fs %8d nodes %10d bytes' %
+                  (key,results[key]['time'],results[key]['nodes'],
+                   results[key]['peak_memory']))
+
+    data = {
+        'python' : platform.python_version(),
+        'implementation' : platform.python_implementation(),
+        'results' : results,
+    }
+    if args.output is not None:
+        with open(args.output,'w') as fid:
+            json.dump(data,fid,indent=2,sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline,'w') as fid:
+            json.dump(data,fid,indent=2,sort_keys=True)
+        return 0
+
+    if not path.exists(args.baseline):
+        print('No baseline found at %s' % args.baseline)
+        return 0
+    with open(args.baseline) as fid:
+        baseline = json.load(fid)['results']
+    regressions = compare(results,baseline,args.tolerance)
+    for message in regressions:
+        print('REGRESSION %s' % message)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#Constraining Order - a simple constraint satisfaction library
+#
+#Copyright (c) 2015 Johannes Reinhardt <jreinhardt@ist-dein-freund.de>
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+"""
+Scaling benchmarks for the operations of the sets module.
+
+Every operation is timed on sets from 10 up to 10^6 intervals or elements,
+until a single call takes longer than a time limit. The growth rate is the
+slope of a straight line fitted to the logarithms of the largest sizes and
+their times. The run fails if the growth rate of an operation exceeds the
+exponent of the complexity documented for it by more than the tolerance.
+Logarithmic factors are covered by the tolerance.
+
+Run from the root of the repository::
+
+    python benchmarks/sets_scaling.py --output sets.json
+"""
+from __future__ import print_function
+import sys
+import json
+import argparse
+from os import path
+from math import log
+from timeit import Timer
+from random import Random
+
+here = path.dirname(path.abspath(__file__))
+sys.path.insert(0,path.join(here,'..','src'))
+
+from constrainingorder.sets import Interval, IntervalSet, DiscreteSet
+
+def intervals(n,offset=0.):
+    """
+    n disjoint closed intervals, in random order
+    """
+    ints = [Interval.closed(2*i + offset,2*i + 1 + offset) for i in range(n)]
+    Random(n).shuffle(ints)
+    return ints
+
+def elements(n,offset=0):
+    """
+    n integers, in random order
+    """
+    elems = list(range(offset,n + offset))
+    Random(n).shuffle(elems)
+    return elems
+
+def interval_sets(n):
+    #the intervals of the second set overlap those of the first
+    return IntervalSet(intervals(n)), IntervalSet(intervals(n,0.5))
+
+def discrete_sets(n):
+    #the second set shares half of its elements with the first
+    return DiscreteSet(elements(n)), DiscreteSet(elements(n,n//2))
+
+#name, exponent of the documented complexity, setup(n) and the operation
+OPERATIONS = [
+    ('IntervalSet construction', 1, intervals, IntervalSet),
+    ('IntervalSet union', 1, interval_sets, lambda a: a[0].union(a[1])),
+    ('IntervalSet intersection', 2, interval_sets,
+     lambda a: a[0].intersection(a[1])),
+    ('IntervalSet difference', 3, interval_sets,
+     lambda a: a[0].difference(a[1])),
+    #the last interval is the worst case for the linear scan
+    ('IntervalSet membership', 1, lambda n: (IntervalSet(intervals(n)),2*n - 1),
+     lambda a: a[1] in a[0]),
+    ('DiscreteSet construction', 1, elements, DiscreteSet),
+    ('DiscreteSet union', 1, discrete_sets, lambda a: a[0].union(a[1])),
+    ('DiscreteSet intersection', 1, discrete_sets,
+     lambda a: a[0].intersection(a[1])),
+    ('DiscreteSet difference', 1, discrete_sets,
+     lambda a: a[0].difference(a[1])),
+    ('DiscreteSet membership', 0, lambda n: (DiscreteSet(elements(n)),n - 1),
+     lambda a: a[1] in a[0]),
+]
+
+def sizes(largest):
+    """
+    Generator for the sizes 10, 20, 50, 100, ... up to largest
+    """
+    size = 10
+    while size <= largest:
+        for factor in [1,2,5]:
+            if factor*size <= largest:
+                yield factor*size
+        size *= 10
+
+def measure(setup,operation,largest,max_time):
+    """
+    Time an operation for increasing sizes, until a single call takes
+    longer than max_time
+
+    returns lists of the sizes and the times per call
+    """
+    ns = []
+    times = []
+    for n in sizes(largest):
+        args = setup(n)
+        number, total = Timer(lambda: operation(args)).autorange()
+        ns.append(n)
+        times.append(total/number)
+        if total/number > max_time:
+            break
+    return ns, times
+
+def growth(ns,times):
+    """
+    Return the slope of the least squares line through the logarithms of
+    sizes and times
+    """
+    xs = [log(n) for n in ns]
+    ys = [log(t) for t in times]
+    mx = sum(xs)/len(xs)
+    my = sum(ys)/len(ys)
+    sxy = sum((x - mx)*(y - my) for x, y in zip(xs,ys))
+    sxx = sum((x - mx)**2 for x in xs)
+    return sxy/sxx
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--output',help='file to write the results to')
+    parser.add_argument('--largest',type=int,default=10**6,
+                        help='largest number of intervals or elements')
+    parser.add_argument('--max-time',type=float,default=1.,
+                        help='time of a single call after which larger '
+                             'sizes are skipped')
+    parser.add_argument('--points',type=int,default=4,
+                        help='number of the largest sizes used for the fit')
+    parser.add_argument('--tolerance',type=float,default=0.5,
+                        help='allowed excess of the growth rate')
+    parser.add_argument('--filter',default='',
+                        help='only run operations containing this string')
+    args = parser.parse_args(argv)
+
+    results = {}
+    failures = []
+    for name, expected, setup, operation in OPERATIONS:
+        if not args.filter in name:
+            continue
+        ns, times = measure(setup,operation,args.largest,args.max_time)
+        result = {'sizes' : ns, 'times' : times, 'expected' : expected}
+        if len(ns) >= 3:
+            result['growth'] = growth(ns[-args.points:],times[-args.points:])
+            status = 'ok'
+            if result['growth'] > expected + args.tolerance:
+                status = 'FAIL'
+                failures.append(name)
+            print('%-28s n up to %7d  growth %5.2f  expected %d  %s' %
+                  (name,ns[-1],result['growth'],expected,status))
+        else:
+            print('%-28s too few sizes to fit the growth' % name)
+        results[name] = result
+
+    if args.output is not None:
+        with open(args.output,'w') as fid:
+            json.dump(results,fid,indent=2,sort_keys=True)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -21,7 +21,7 @@ setup(
     include_package_data=True,
     description='Pure python constraint satisfaction solver',
     long_description=long_description,
-    install_requires=['future'],
+    install_requires=['future','futures; python_version < "3.2"'],
     author="Johannes Reinhardt",
     author_email="jreinhardt@ist-dein-freund.de",
     license="MIT",
@@ -26,6 +26,7 @@ This module defines common stuff for constraint satisfaction probleme
 
 from __future__ import unicode_literals
 from builtins import object
+from collections import OrderedDict
 
 class Space(object):
     """
@@ -42,13 +43,134 @@ class Space(object):
         """
         self.constraints = constraints
         "list of constraints"
-        self.variables = {}
-        "dictionary of variable names to variable instances"
+        self.variables = OrderedDict()
+        "ordered dictionary of variable names to variable instances"
         self.domains = {}
         "dictionary of variable names to DiscreteSet/IntervalSet with admissible values"
         for var in variables:
             self.variables[var.name] = var
             self.domains[var.name] = var.domain
+        self.var_constraints = {}
+        "dictionary of variable names to lists of constraints affecting them"
+        self._indexed = None
+        self.reindex()
+        self.value_symmetries = []
+        "list of tuples of sorted interchangeable values and the names of the variables in which they are interchangeable"
+        self.variable_symmetries = []
+        "list of tuples with the names of interchangeable variables"
+
+    def reindex(self):
+        """
+        Update var_constraints if the list of constraints was changed since
+        it was last indexed. The solvers and propagation functions call this
+        before they start, so constraints can be added to or removed from
+        the list at any time before.
+        """
+        if self._indexed is not None and \
+                len(self._indexed) == len(self.constraints) and \
+                all(c1 is c2 for c1,c2 in zip(self._indexed,self.constraints)):
+            return
+        self.var_constraints = {}
+        for name in self.variables:
+            self.var_constraints[name] = []
+        for const in self.constraints:
+            for name in const.vnames:
+                self.var_constraints.setdefault(name,[]).append(const)
+        self._indexed = list(self.constraints)
+
+    def add_value_symmetry(self,values,vnames=None):
+        """
+        Declare that values are interchangeable, i.e. that every permutation
+        of these values in the given variables maps solutions to solutions,
+        as for example colours in graph colouring. The values need to be
+        comparable.
+
+        :param values: The interchangeable values
+        :type values: sequence
+        :param vnames: The names of the variables in which the values are
+                       interchangeable, by default all variables
+        :type vnames: sequence of str
+        :raises ValueError: if a variable is not part of this space
+        """
+        if vnames is None:
+            vnames = list(self.variables.keys())
+        self._check_names(vnames)
+        self.value_symmetries.append((tuple(sorted(set(values))),
+                                      tuple(vnames)))
+
+    def add_variable_symmetry(self,vnames):
+        """
+        Declare that variables are interchangeable, i.e. that every
+        permutation of the values of these variables maps solutions to
+        solutions, as for example identical machines. The values of the
+        variables need to be comparable.
+
+        :param vnames: The names of the interchangeable variables
+        :type vnames: sequence of str
+        :raises ValueError: if a variable is not part of this space
+        """
+        self._check_names(vnames)
+        self.variable_symmetries.append(tuple(vnames))
+
+    def _check_names(self,vnames):
+        for name in vnames:
+            if not name in self.variables:
+                raise ValueError("Unknown variable: %s" % name)
+
+    def components(self):
+        """
+        Split the space into independent subspaces, such that no constraint
+        affects variables of different subspaces. Constraints that affect
+        none of the variables form a subspace without variables.
+
+        A symmetry permutes the values of all its variables at once, so the
+        variables of a value or variable symmetry are kept in the same
+        subspace, together with the symmetry.
+
+        :returns: the subspaces
+        :rtype: list of Spaces
+        """
+        parent = dict((name,name) for name in self.variables)
+        groups = [const.vnames for const in self.constraints]
+        groups += [vnames for values, vnames in self.value_symmetries]
+        groups += self.variable_symmetries
+        for vnames in groups:
+            names = [name for name in vnames if name in parent]
+            for name in names[1:]:
+                parent[_root(parent,name)] = _root(parent,names[0])
+
+        groups = {}
+        roots = []
+        for name in self.variables:
+            root = _root(parent,name)
+            if not root in groups:
+                groups[root] = ([],[])
+                roots.append(root)
+            groups[root][0].append(self.variables[name])
+        loose = []
+        for const in self.constraints:
+            names = [name for name in const.vnames if name in parent]
+            if len(names) == 0:
+                loose.append(const)
+            else:
+                groups[_root(parent,names[0])][1].append(const)
+
+        spaces = []
+        for root in roots:
+            variables, constraints = groups[root]
+            space = Space(variables,constraints)
+            for var in variables:
+                space.domains[var.name] = self.domains[var.name]
+            for values, vnames in self.value_symmetries:
+                if len(vnames) > 0 and vnames[0] in space.variables:
+                    space.value_symmetries.append((values,vnames))
+            for vnames in self.variable_symmetries:
+                if len(vnames) > 0 and vnames[0] in space.variables:
+                    space.variable_symmetries.append(vnames)
+            spaces.append(space)
+        if len(loose) > 0:
+            spaces.append(Space([],loose))
+        return spaces
 
     def is_discrete(self):
         """
@@ -74,3 +196,15 @@ class Space(object):
             if not const.satisfied(lab):
                 return False
         return True
+
+def _root(parent,name):
+    """
+    Find the representative of the set containing name in a union-find
+    forest, and shorten the path to it
+    """
+    root = name
+    while parent[root] != root:
+        root = parent[root]
+    while parent[name] != root:
+        parent[name], name = root, parent[name]
+    return root
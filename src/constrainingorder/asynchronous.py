@@ -0,0 +1,222 @@
+#Constraining Order - a simple constraint satisfaction library
+#
+#Copyright (c) 2015 Johannes Reinhardt <jreinhardt@ist-dein-freund.de>
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+"""
+This module contains functions for solving CSPs in asyncio programs. It uses
+async generators and needs Python 3.6 or newer.
+"""
+import asyncio
+from queue import Empty, Full
+from threading import Event, Semaphore, Thread
+from multiprocessing import Manager
+from concurrent.futures import ProcessPoolExecutor
+from constrainingorder.solver import Budget, solve, _solutions
+
+async def asolve(space,method='backtrack',ordering=None,value_ordering=None,
+                 seed=None,nogoods=None,budget=None,interval=100):
+    """
+    Asynchronous generator for all solutions, to be used with async for.
+
+    The search runs in the event loop, but returns control to it every
+    interval assignments, so that other tasks are not blocked for long.
+
+    :param Space space: The space to solve
+    :param str method: The solution method to employ, see
+                       :func:`~constrainingorder.solver.solve`
+    :param ordering: an optional parameter ordering, or the name of a
+                     heuristic, see :func:`~constrainingorder.solver.solve`
+    :param str value_ordering: an optional strategy for the order in which
+                               values are tried
+    :param seed: seed for the random number generator used by the "random"
+                 value ordering
+    :param NogoodStore nogoods: an optional store for learned nogoods
+    :param Budget budget: optional limits for the search
+    :param int interval: number of assignments after which control is
+                         returned to the event loop
+    :return: asynchronous generator of solutions
+    """
+    for label in _solutions(space,method,ordering,value_ordering,seed,
+                            nogoods,budget,interval,None,False):
+        if label is None:
+            await asyncio.sleep(0)
+        else:
+            yield label
+
+async def asolve_in_executor(space,executor=None,method='backtrack',
+                             ordering=None,value_ordering=None,seed=None,
+                             budget=None,maxsize=100):
+    """
+    Asynchronous generator for all solutions, to be used with async for.
+
+    The search runs in a worker thread or process of the executor, and the
+    solutions are streamed back through a queue, so the event loop is not
+    blocked by the search at all. The worker waits when the queue is full.
+    Waiting for solutions does not occupy a thread of an executor, so any
+    number of searches can share the default executor. The solutions of a
+    process are moved to the event loop by a separate thread.
+
+    When the generator is closed before the search finished, the search is
+    cancelled. A search in a thread stops at the next node, a search in a
+    process when it finds the next solution.
+
+    With a ProcessPoolExecutor, the space and all its constraints need to
+    be picklable.
+
+    :param Space space: The space to solve
+    :param executor: the executor to run the search, by default the
+                     default executor of the event loop
+    :type executor: ThreadPoolExecutor or ProcessPoolExecutor
+    :param str method: The solution method to employ, see
+                       :func:`~constrainingorder.solver.solve`
+    :param ordering: an optional parameter ordering, or the name of a
+                     heuristic, see :func:`~constrainingorder.solver.solve`
+    :param str value_ordering: an optional strategy for the order in which
+                               values are tried
+    :param seed: seed for the random number generator used by the "random"
+                 value ordering
+    :param Budget budget: optional limits for the search
+    :param int maxsize: maximum number of solutions waiting in the queue
+    :return: asynchronous generator of solutions
+    """
+    loop = asyncio.get_event_loop()
+    if budget is None:
+        budget = Budget()
+    results = _LoopQueue(loop,maxsize)
+    stop = Event()
+    manager = None
+    drain = None
+    if isinstance(executor,ProcessPoolExecutor):
+        manager = Manager()
+        queue = manager.Queue(maxsize)
+        cancel = manager.Event()
+        drain = Thread(target=_drain,args=(queue,results,stop))
+        drain.daemon = True
+        drain.start()
+    else:
+        queue = results
+        cancel = stop
+    options = (method,ordering,value_ordering,seed)
+
+    future = loop.run_in_executor(executor,_produce,space,options,budget,
+                                  queue,cancel)
+    try:
+        while True:
+            label = await results.get()
+            if label is None:
+                break
+            yield label
+        await future
+    finally:
+        if not future.done():
+            cancel.set()
+            budget.cancel()
+            await asyncio.wait([future])
+        stop.set()
+        if drain is not None:
+            drain.join()
+        if manager is not None:
+            manager.shutdown()
+        if not future.cancelled() and future.exception() is None:
+            result = future.result()
+            if result is not budget:
+                #the worker process searched with a copy
+                budget.found = result.found
+                budget.nodes = result.nodes
+                budget.finished = result.finished
+                budget.stopped = result.stopped
+
+def _produce(space,options,budget,queue,stop):
+    """
+    Search the space and put the solutions into the queue, followed by
+    None. The search is cancelled when stop is set.
+
+    returns the budget
+    """
+    try:
+        for label in solve(space,*options,budget=budget):
+            if not _put(queue,stop,label):
+                budget.cancel()
+                budget.exceeded()
+                break
+    finally:
+        if not _put(queue,stop,None):
+            #nobody waits for the queue to be filled, unless it is empty
+            try:
+                queue.put_nowait(None)
+            except Full:
+                pass
+    return budget
+
+def _drain(source,sink,stop):
+    """
+    Move the items from the queue of a worker process to the queue of the
+    event loop, until None was moved or stop is set
+    """
+    while not stop.is_set():
+        try:
+            item = source.get(timeout=0.1)
+        except Empty:
+            continue
+        if not _put(sink,stop,item) or item is None:
+            return
+
+class _LoopQueue(object):
+    """
+    Queue from worker threads to the event loop. Items are handed to an
+    asyncio.Queue with call_soon_threadsafe, and a semaphore counts the free
+    places, so that the workers wait while maxsize items are not consumed
+    yet, but the event loop never waits in a thread.
+    """
+    def __init__(self,loop,maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self.free = Semaphore(maxsize)
+        "number of items that can be put before one is consumed"
+
+    def put(self,item,timeout=None):
+        if not self.free.acquire(timeout=timeout):
+            raise Full
+        self.loop.call_soon_threadsafe(self.queue.put_nowait,item)
+
+    def put_nowait(self,item):
+        if not self.free.acquire(False):
+            raise Full
+        self.loop.call_soon_threadsafe(self.queue.put_nowait,item)
+
+    async def get(self):
+        item = await self.queue.get()
+        self.free.release()
+        return item
+
+def _put(queue,stop,item):
+    """
+    Put the item into the queue, waiting while it is full
+
+    returns False if stop was set while waiting
+    """
+    while not stop.is_set():
+        try:
+            queue.put(item,timeout=0.1)
+            return True
+        except Full:
+            pass
+    return False
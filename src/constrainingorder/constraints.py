@@ -29,6 +29,12 @@ from constrainingorder.sets import DiscreteSet, IntervalSet
 from itertools import product
 
 class Constraint(object):
+    consistent_implies_satisfied = False
+    """
+    Whether a labeling that assigns all affected variables and is consistent
+    with this constraint also satisfies it. Solvers can then skip the check
+    for satisfaction of complete labelings.
+    """
     def __init__(self,domains):
         self.vnames = [v.name for v in domains.keys()]
         "Names of the variables affected by this constraint"
@@ -57,6 +63,8 @@ class FixedValue(Constraint):
     """
     Constraint that fixes a variable to a value
     """
+    consistent_implies_satisfied = True
+
     def __init__(self,variable,value):
         """
         Create a new FixedValue constraint. It enforces that a variable
@@ -92,6 +100,8 @@ class AllDifferent(Constraint):
     """
     Constraint enforcing different values between a number of variables
     """
+    consistent_implies_satisfied = True
+
     def __init__(self,variables):
         """
         Create a new AllDifferent constraint. It enforces that a set of
@@ -122,6 +132,8 @@ class Domain(Constraint):
     Constraint that ensures that value of a variable falls into a given
     domain
     """
+    consistent_implies_satisfied = True
+
     def __init__(self,variable,domain):
         """
         Create a new Domain constraint. It enforces that a variable takes on
@@ -153,6 +165,8 @@ class BinaryRelation(Constraint):
     Abstract Base class for constraint the describe a binary relation between
     two variables.
     """
+    consistent_implies_satisfied = True
+
     def __init__(self,var1,var2):
         """
         Create a new binary relation constraint between these two variables
@@ -245,6 +259,8 @@ class DiscreteBinaryRelation(Constraint):
     General binary relation between discrete variables represented by the
     tuples that are in this relation
     """
+    consistent_implies_satisfied = True
+
     def __init__(self,var1,var2,tuples):
         """
         Create a new DiscreteBinaryRelation constraint. It restricts the values of the two variables to a set of possible combinations.
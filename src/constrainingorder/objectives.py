@@ -0,0 +1,103 @@
+#Constraining Order - a simple constraint satisfaction library
+#
+#Copyright (c) 2015 Johannes Reinhardt <jreinhardt@ist-dein-freund.de>
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+"""
+This module defines classes describing objectives for optimization
+"""
+from __future__ import unicode_literals
+from builtins import object
+
+class Objective(object):
+    """
+    Abstract baseclass for objectives.
+
+    An objective assigns a number to complete labelings. To prune the search
+    for good labelings, it also bounds the values of all labelings extending
+    a partial one.
+    """
+    def __init__(self,variables):
+        self.vnames = [v.name for v in variables]
+        "Names of the variables the objective depends on"
+    def value(self,lab):
+        """
+        compute the value of a labeling that assigns all variables of the
+        objective
+
+        :param dict lab: A dictionary with parameter names and values
+        :rtype: number
+        """
+        raise NotImplementedError
+    def bounds(self,domains,lab):
+        """
+        bound the values of all labelings that extend the labeling with
+        values from the domains. The default implementation only knows the
+        value once all variables are assigned, objectives should override
+        it to give tighter bounds.
+
+        :param dict domains: A dictionary with parameter names and sequences
+                             of their admissible values
+        :param dict lab: A dictionary with parameter names and values
+        :return: the lower and the upper bound
+        :rtype: tuple
+        """
+        for vname in self.vnames:
+            if not vname in lab:
+                return float('-inf'), float('inf')
+        value = self.value(lab)
+        return value, value
+
+class LinearObjective(Objective):
+    """
+    Objective that is a weighted sum of the values of variables
+    """
+    def __init__(self,coefficients,constant=0):
+        """
+        Create a new LinearObjective.
+
+        :param dict coefficients: A dictionary with Variables and the
+                                  factors for their values
+        :param constant: A number that is added to the sum
+        """
+        Objective.__init__(self,coefficients.keys())
+        self.coefficients = dict((v.name,c) for v,c in coefficients.items())
+        "Dictionary with parameter names and factors"
+        self.constant = constant
+        "Number added to the sum"
+
+    def value(self,lab):
+        value = self.constant
+        for vname,coefficient in self.coefficients.items():
+            value += coefficient*lab[vname]
+        return value
+
+    def bounds(self,domains,lab):
+        lower = upper = self.constant
+        for vname,coefficient in self.coefficients.items():
+            if vname in lab:
+                terms = [coefficient*lab[vname]]
+            else:
+                terms = [coefficient*val for val in domains[vname]]
+                if len(terms) == 0:
+                    return float('inf'), float('-inf')
+            lower += min(terms)
+            upper += max(terms)
+        return lower, upper
@@ -0,0 +1,212 @@
+#Constraining Order - a simple constraint satisfaction library
+#
+#Copyright (c) 2015 Johannes Reinhardt <jreinhardt@ist-dein-freund.de>
+#
+#Permission is hereby granted, free of charge, to any person obtaining a copy
+#of this software and associated documentation files (the "Software"), to deal
+#in the Software without restriction, including without limitation the rights
+#to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#copies of the Software, and to permit persons to whom the Software is
+#furnished to do so, subject to the following conditions:
+#
+#The above copyright notice and this permission notice shall be included in all
+#copies or substantial portions of the Software.
+#
+#THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#SOFTWARE.
+
+"""
+This module contains functions for solving CSPs on several processes
+"""
+from __future__ import unicode_literals
+from collections import deque
+from multiprocessing import cpu_count
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from constrainingorder.solver import _searcher, _restrict, _product, \
+    _Incumbent
+
+def parallel_solve(space,workers=None,method='backtrack',ordering=None,
+                   value_ordering=None,seed=None,max_nodes=10000):
+    """
+    Generator for all solutions of a space, searched by a pool of worker
+    processes.
+
+    The search tree is split into subproblems by fixing the values of the
+    first variables, which are solved independently by the workers.
+    Solutions are yielded as soon as a worker returns them, so they do not
+    arrive in the same order as from :func:`~constrainingorder.solver.solve`.
+
+    A worker gives up a subproblem after max_nodes assignments, and returns
+    the part of its tree it did not explore as new subproblems. So large
+    subtrees are split further, while small ones are solved in one go. As
+    long as there are fewer subproblems than workers, they are split after
+    a single assignment.
+
+    Independent components of the space are searched side by side on the
+    same pool, and their solutions are combined.
+
+    The space and all its constraints need to be picklable.
+
+    :param Space space: The space to solve
+    :param int workers: number of worker processes, by default the number
+                        of CPUs
+    :param str method: The solution method to employ, see
+                       :func:`~constrainingorder.solver.solve`
+    :param ordering: an optional parameter ordering, or the name of a
+                     heuristic, see :func:`~constrainingorder.solver.solve`
+    :param str value_ordering: an optional strategy for the order in which
+                               values are tried
+    :param seed: seed for the random number generator used by the "random"
+                 value ordering
+    :param int max_nodes: number of assignments after which a worker splits
+                          its subproblem
+    :return: generator of solutions
+    """
+    space.reindex()
+    if not space.is_discrete():
+        raise ValueError("Can not backtrack on non-discrete space")
+    if workers is None:
+        workers = cpu_count()
+    options = (method,ordering,value_ordering,seed)
+
+    executor = ProcessPoolExecutor(workers)
+    streams = []
+    try:
+        components = space.components()
+        if len(components) > 1:
+            for component in components:
+                options = (method,_restrict(ordering,component),
+                           value_ordering,seed)
+                streams.append(_solve(executor,workers,component,options,
+                                      max_nodes))
+            for label in _product(streams):
+                yield label
+        else:
+            streams.append(_solve(executor,workers,space,options,max_nodes))
+            for label in streams[0]:
+                yield label
+    finally:
+        for stream in streams:
+            stream.close()
+        executor.shutdown()
+
+def parallel_optimize(space,objective,sense='min',workers=None,
+                      method='backtrack',ordering=None,value_ordering=None,
+                      seed=None,max_nodes=10000):
+    """
+    Generator for solutions with better and better values of an objective,
+    found by branch and bound on a pool of worker processes.
+
+    The search tree is split into subproblems like in
+    :func:`parallel_solve`, and every worker prunes its subproblem like
+    :func:`~constrainingorder.solver.optimize`. The bound is shared: every
+    subproblem is submitted with the value of the best solution found by
+    any worker so far, and as workers split their subproblems every
+    max_nodes assignments, an improvement soon reaches all of them. Only
+    solutions that improve on all solutions yielded before are yielded, so
+    the last solution is optimal.
+
+    The space, its constraints and the objective need to be picklable.
+
+    :param Space space: The space to search
+    :param Objective objective: The objective to optimize
+    :param str sense: "min" to minimize the objective, "max" to maximize it
+    :param int workers: number of worker processes, by default the number
+                        of CPUs
+    :param str method: The solution method to employ, see
+                       :func:`~constrainingorder.solver.optimize`
+    :param ordering: an optional parameter ordering, or the name of a
+                     heuristic, see :func:`~constrainingorder.solver.solve`
+    :param str value_ordering: an optional strategy for the order in which
+                               values are tried
+    :param seed: seed for the random number generator used by the "random"
+                 value ordering
+    :param int max_nodes: number of assignments after which a worker splits
+                          its subproblem
+    :return: generator of solutions
+    """
+    space.reindex()
+    if not space.is_discrete():
+        raise ValueError("Can not backtrack on non-discrete space")
+    incumbent = _Incumbent(objective,sense)
+    if workers is None:
+        workers = cpu_count()
+    options = (method,ordering,value_ordering,seed)
+
+    executor = ProcessPoolExecutor(workers)
+    def submit(prefix,budget):
+        return executor.submit(_subproblem,space,prefix,options,budget,
+                               _Incumbent(objective,sense,incumbent.cost))
+    stream = _schedule(workers,submit,max_nodes)
+    try:
+        for label in stream:
+            if incumbent.improves(label):
+                incumbent.improve(label)
+                yield label
+    finally:
+        stream.close()
+        executor.shutdown()
+
+def _solve(executor,workers,space,options,max_nodes):
+    """
+    Generator for the solutions of a space, searched by the executor
+    """
+    def submit(prefix,budget):
+        return executor.submit(_subproblem,space,prefix,options,budget)
+    return _schedule(workers,submit,max_nodes)
+
+def _schedule(workers,submit,max_nodes):
+    """
+    Generator for the solutions of the subproblems, which are submitted to
+    the executor with submit(prefix,budget)
+    """
+    pending = deque([{}])
+    running = set([])
+    try:
+        while pending or running:
+            while pending and len(running) < 2*workers:
+                #split quickly while there is not enough work for everyone
+                if len(pending) + len(running) < workers:
+                    budget = 1
+                else:
+                    budget = max_nodes
+                running.add(submit(pending.popleft(),budget))
+            done, running = wait(running,return_when=FIRST_COMPLETED)
+            for future in done:
+                solutions, frontier = future.result()
+                pending.extend(frontier)
+                for label in solutions:
+                    yield label
+    finally:
+        for future in running:
+            future.cancel()
+
+def _subproblem(space,prefix,options,max_nodes,incumbent=None):
+    """
+    Search the subtree of the space below the labeling prefix for at most
+    max_nodes assignments. With an incumbent, only solutions improving on
+    it are searched, and it is tightened with every solution.
+
+    returns the solutions found and the labelings of the unexplored subtrees
+    """
+    method, ordering, value_ordering, seed = options
+    search = _searcher(space,method,ordering,value_ordering,seed,None,
+                       incumbent=incumbent)
+    if search is None:
+        return [], []
+    label = {}
+    for vname,val in prefix.items():
+        if not search.assume(label,vname,val):
+            return [], []
+    search.max_nodes = search.nodes + max_nodes
+    solutions = []
+    for solution in search.solutions(label):
+        if incumbent is not None:
+            incumbent.improve(solution)
+        solutions.append(solution)
+    return solutions, search.frontier
@@ -314,7 +314,8 @@ class IntervalSet(object):
     """
     def __init__(self,ints):
         """
-        Create a new IntervalSet.
+        Create a new IntervalSet. This takes O(n log n) time for n
+        intervals.
 
         :param sequence ints: Intervals for this IntervalSet
         """
@@ -381,7 +382,8 @@ class IntervalSet(object):
     def intersection(self,other):
         """
         Return a new IntervalSet with the intersection of the two sets, i.e.
-        all elements that are both in self and other.
+        all elements that are both in self and other. This takes O(n m)
+        time for sets of n and m intervals.
 
         :param IntervalSet other: Set to intersect with
         :rtype: IntervalSet
@@ -396,7 +398,8 @@ class IntervalSet(object):
     def union(self,other):
         """
         Return a new IntervalSet with the union of the two sets, i.e.
-        all elements that are in self or other.
+        all elements that are in self or other. This takes O((n+m) log(n+m))
+        time for sets of n and m intervals.
 
         :param IntervalSet other: Set to intersect with
         :rtype: IntervalSet
@@ -406,7 +409,8 @@ class IntervalSet(object):
     def difference(self,other):
         """
         Return a new IntervalSet with the difference of the two sets, i.e.
-        all elements that are in self but not in other.
+        all elements that are in self but not in other. This takes
+        O(n^2 m log n) time for sets of n and m intervals.
 
         :param IntervalSet other: Set to subtract
         :rtype: IntervalSet
@@ -421,7 +425,8 @@ class IntervalSet(object):
 
     def __contains__(self,x):
         """
-        Check membership of the element.
+        Check membership of the element. This takes O(n) time for n
+        intervals.
 
         :param element: Element to check membership of
         :rtype: bool
@@ -451,12 +456,13 @@ class DiscreteSet(object):
     """
     def __init__(self,elements):
         """
-        Create a new DiscreteSet
+        Create a new DiscreteSet. This takes O(n) time for n elements.
 
         :param sequence elements: The elements of the newly created set
         """
         self.everything = False
         self.elements = frozenset(elements)
+        self._members = None
 
     @classmethod
     def everything(cls):
@@ -492,7 +498,8 @@ class DiscreteSet(object):
     def intersection(self,other):
         """
         Return a new DiscreteSet with the intersection of the two sets, i.e.
-        all elements that are in both self and other.
+        all elements that are in both self and other. This takes
+        O(min(n,m)) time for sets of n and m elements.
 
         :param DiscreteSet other: Set to intersect with
         :rtype: DiscreteSet
@@ -511,7 +518,8 @@ class DiscreteSet(object):
     def difference(self,other):
         """
         Return a new DiscreteSet with the difference of the two sets, i.e.
-        all elements that are in self but not in other.
+        all elements that are in self but not in other. This takes O(n)
+        time for a set of n elements.
 
         :param DiscreteSet other: Set to subtract
         :rtype: DiscreteSet
@@ -527,7 +535,8 @@ class DiscreteSet(object):
     def union(self,other):
         """
         Return a new DiscreteSet with the union of the two sets, i.e.
-        all elements that are in self or in other.
+        all elements that are in self or in other. This takes O(n+m) time
+        for sets of n and m elements.
 
         :param DiscreteSet other: Set to unite with
         :rtype: DiscreteSet
@@ -547,12 +556,14 @@ class DiscreteSet(object):
         """
         if self.everything:
             raise ValueError("Can not iterate everything")
-        for coord in sorted(self.elements):
-            yield coord
+        #the elements are immutable, so they only need to be sorted once
+        if self._members is None:
+            self._members = tuple(sorted(self.elements))
+        return iter(self._members)
 
     def __contains__(self,element):
         """
-        Check membership of the element.
+        Check membership of the element. This takes O(1) time.
 
         :param element: Element to check membership of
         :rtype: bool
@@ -25,49 +25,588 @@ This module contains functions for solving and reducing CSPs
 """
 from __future__ import unicode_literals
 from itertools import product
+from heapq import heappush, heappop, heapify
+from random import Random
+from collections import OrderedDict
+try:
+    from time import monotonic, perf_counter
+except ImportError:
+    #Python 2
+    from time import time as monotonic
+    from timeit import default_timer as perf_counter
+try:
+    basestring
+except NameError:
+    #Python 3
+    basestring = str
 from constrainingorder import Space
-from constrainingorder.constraints import FixedValue
-from constrainingorder.sets import DiscreteSet, IntervalSet
+from constrainingorder.sets import DiscreteSet, IntervalSet, Interval
+from constrainingorder.constraints import Less, LessEqual, Greater, \
+    GreaterEqual, Equal, DiscreteBinaryRelation
 
-def ac3(space):
+def propagate(space,method='ac3',stats=None):
+    """
+    Reduce the domains of the variables by propagating constraints.
+
+    :param Space space: The space to reduce
+    :param str method: the propagation method to employ
+    :param Statistics stats: an optional object to record the work done
+    :returns: the number of constraint checks performed
+    :rtype: int
+
+    Methods:
+
+    :"ac3": arc consistency with the AC-3 algorithm, see :func:`ac3`
+    :"ac2001": arc consistency with the AC-2001 algorithm, see :func:`ac2001`
+    :"pc2": path consistency with the PC-2 algorithm, see :func:`pc2`
+    :"sac": singleton arc consistency, see :func:`sac`
+    :"bounds": bounds consistency for continuous spaces, see
+               :func:`bounds_consistency`
+    """
+    if method == 'ac3':
+        return ac3(space,stats)
+    elif method == 'ac2001':
+        return ac2001(space,stats)
+    elif method == 'pc2':
+        return pc2(space,stats)
+    elif method == 'sac':
+        return sac(space,stats)
+    elif method == 'bounds':
+        return bounds_consistency(space,stats)
+    else:
+        raise ValueError("Unknown propagation method: %s" % method)
+
+def ac3(space,stats=None):
     """
     AC-3 algorithm. This reduces the domains of the variables by
     propagating constraints to ensure arc consistency.
 
+    Arcs are kept per constraint, and when the domain of a variable is
+    narrowed, only the arcs of constraints affecting this variable are
+    revisited.
+
+    :param Space space: The space to reduce
+    :param Statistics stats: an optional object to record the work done
+    :returns: the number of constraint checks performed
+    :rtype: int
+    """
+    counts = {'checks' : 0}
+
+    def revise(const,vname1,vname2):
+        return _binary(space,const,vname1,vname2,counts)
+
+    _arc_consistency(space,revise,stats)
+    if stats is not None:
+        stats.checks += counts['checks']
+    return counts['checks']
+
+def ac2001(space,stats=None):
+    """
+    AC-2001 (also known as AC-3.1) algorithm. This reduces the domains of
+    the variables to the same arc consistent domains as :func:`ac3`, but
+    remembers the last support found for each value. When an arc is
+    revisited, the search for a support only resumes if this support has
+    been removed, which saves many constraint checks on large domains.
+
+    :param Space space: The space to reduce
+    :param Statistics stats: an optional object to record the work done
+    :returns: the number of constraint checks performed
+    :rtype: int
+    """
+    counts = {'checks' : 0}
+    #the order in which supports are searched, fixed after node consistency
+    order = {}
+    #index of the last support found for a constraint, variable and value
+    last = {}
+
+    def revise(const,vname1,vname2):
+        if not vname2 in order:
+            order[vname2] = list(space.domains[vname2].iter_members())
+        return _binary2001(space,const,vname1,vname2,order[vname2],last,counts)
+
+    _arc_consistency(space,revise,stats)
+    if stats is not None:
+        stats.checks += counts['checks']
+    return counts['checks']
+
+def pc2(space,stats=None):
+    """
+    PC-2 algorithm. This reduces the domains of the variables and the pairs
+    of values that two variables can take together, such that every
+    consistent pair of values of two variables can be extended to every
+    third variable. This implies arc consistency, and prunes more than it,
+    but is much more expensive, so it is mostly useful as a preprocessing
+    step for dense binary spaces.
+
+    Like in :func:`ac3`, constraints are assumed to couple all pairs of
+    variables they affect, and only checked for pairs. For every pair of
+    variables, the values of the second variable that are
+    compatible with a value of the first one are kept as sets, so revising
+    a pair through a third variable intersects these support sets. This
+    takes O(n^2 d^2) memory and O(n^3 d^3) time for n variables with d
+    values.
+
+    The domains of the space are reduced, and a DiscreteBinaryRelation is
+    added to the constraints of the space for every pair of variables that
+    lost pairs of values. The number of these pairs is added to the pairs of
+    stats.
+
     :param Space space: The space to reduce
+    :param Statistics stats: an optional object to record the work done
+    :returns: the number of constraint checks performed
+    :rtype: int
+    :raises ValueError: if the space is not discrete
     """
-    #determine arcs
-    arcs = {}
-    for name in space.variables:
-        arcs[name] = set([])
+    space.reindex()
+    if not space.is_discrete():
+        raise ValueError("Can not enforce path consistency on non-discrete space")
+    if stats is not None:
+        start = perf_counter()
+        size = _size(space)
+    checks = 0
+    vnames = list(space.variables.keys())
+    store = _Store(space)
+    domains = dict((vname,set(store.domains[vname])) for vname in vnames)
+    binary = {}
     for const in space.constraints:
-        for vname1,vname2 in product(const.vnames,const.vnames):
-            if vname1 != vname2:
-                #this is pessimistic, we assume that each constraint
-                #pairwisely couples all variables it affects
-                arcs[vname1].add(vname2)
+        for name1, name2 in product(const.vnames,repeat=2):
+            if name1 != name2 and name1 in domains and name2 in domains:
+                binary.setdefault((name1,name2),[]).append(const)
 
+    #relation[name1][name2][val1] are the values of name2 that are
+    #compatible with val1
+    relation = dict((vname,{}) for vname in vnames)
+    for i, name1 in enumerate(vnames):
+        for name2 in vnames[i+1:]:
+            rel12 = dict((val,set([])) for val in domains[name1])
+            rel21 = dict((val,set([])) for val in domains[name2])
+            consts = binary.get((name1,name2),[])
+            for val1 in domains[name1]:
+                for val2 in domains[name2]:
+                    checks += len(consts)
+                    label = {name1 : val1, name2 : val2}
+                    if all(const.consistent(label) for const in consts):
+                        rel12[val1].add(val2)
+                        rel21[val2].add(val1)
+            relation[name1][name2] = rel12
+            relation[name2][name1] = rel21
+
+    #pairs of values removed by revisions, not because a value was removed
+    removed = dict((vname,{}) for vname in vnames)
+    queue = set([])
+    #values without support in a relation
+    empty = []
+    for i, name1 in enumerate(vnames):
+        for name2 in vnames[i+1:]:
+            _pc_requeue(vnames,queue,name1,name2)
+            _pc_requeue(vnames,queue,name2,name1)
+    for name1 in vnames:
+        for name2 in relation[name1]:
+            for val1, values in relation[name1][name2].items():
+                if len(values) == 0:
+                    empty.append((name1,val1))
+
+    wiped = False
+    while not wiped:
+        #values without support in some relation are removed from the domain
+        while empty:
+            vname, val = empty.pop()
+            if not val in domains[vname]:
+                continue
+            domains[vname].discard(val)
+            if len(domains[vname]) == 0:
+                wiped = True
+                break
+            for other in relation[vname]:
+                for val2 in relation[vname][other].pop(val):
+                    relation[other][vname][val2].discard(val)
+                    if len(relation[other][vname][val2]) == 0:
+                        empty.append((other,val2))
+                _pc_requeue(vnames,queue,vname,other)
+                _pc_requeue(vnames,queue,other,vname)
+        if wiped or not queue:
+            break
+
+        #revise the pair name1, name2 through name3
+        name1, name2, name3 = queue.pop()
+        rel12 = relation[name1][name2]
+        rel21 = relation[name2][name1]
+        rel13 = relation[name1][name3]
+        rel23 = relation[name2][name3]
+        changed = False
+        for val1 in list(rel12):
+            for val2 in list(rel12[val1]):
+                checks += 1
+                if rel13[val1].isdisjoint(rel23[val2]):
+                    rel12[val1].discard(val2)
+                    rel21[val2].discard(val1)
+                    removed[name1].setdefault(name2,set([])).add((val1,val2))
+                    changed = True
+                    if len(rel12[val1]) == 0:
+                        empty.append((name1,val1))
+                    if len(rel21[val2]) == 0:
+                        empty.append((name2,val2))
+        if changed:
+            _pc_requeue(vnames,queue,name1,name2)
+            _pc_requeue(vnames,queue,name2,name1)
+
+    pairs = 0
+    constraints = []
+    for vname, values in domains.items():
+        space.domains[vname] = DiscreteSet(list(values))
+    if not wiped:
+        for i, name1 in enumerate(vnames):
+            for name2 in vnames[i+1:]:
+                cut = set(removed[name1].get(name2,[]))
+                cut.update((v1,v2) for v2,v1 in removed[name2].get(name1,[]))
+                cut = [(v1,v2) for v1,v2 in cut
+                       if v1 in domains[name1] and v2 in domains[name2]]
+                if len(cut) == 0:
+                    continue
+                pairs += len(cut)
+                tuples = set((val1,val2) for val1 in domains[name1]
+                             for val2 in relation[name1][name2][val1])
+                constraints.append(DiscreteBinaryRelation(
+                    space.variables[name1],space.variables[name2],tuples))
+    space.constraints = space.constraints + constraints
+    space.reindex()
+
+    if stats is not None:
+        stats.checks += checks
+        stats.pairs += pairs
+        stats.pruned += size - _size(space)
+        stats.propagation_time += perf_counter() - start
+    return checks
+
+def _pc_requeue(vnames,queue,name1,name2):
+    """
+    Add the revisions that depend on the relation between name1 and name2
+    to the queue of pc2, i.e. those of name1 and any other variable through
+    name2
+    """
+    for vname in vnames:
+        if vname != name1 and vname != name2:
+            queue.add((name1,vname,name2))
+
+def sac(space,stats=None):
+    """
+    Singleton arc consistency. This reduces the domains of the variables
+    such that the space stays arc consistent when any remaining value is
+    assigned to its variable. It prunes more than arc consistency, but
+    needs one arc consistency propagation for every value.
+
+    For every value that passed the test, the values that were removed by
+    its propagation are remembered. When values are removed later, a value
+    is only tested again if not all of them were removed by its own
+    propagation, as otherwise the outcome of the test can not change.
+
+    :param Space space: The space to reduce
+    :param Statistics stats: an optional object to record the work done
+    :returns: the number of constraint checks performed
+    :rtype: int
+    :raises ValueError: if the space is not discrete
+    """
+    space.reindex()
+    if not space.is_discrete():
+        raise ValueError("Can not enforce singleton arc consistency on non-discrete space")
+    if stats is not None:
+        start = perf_counter()
+        size = _size(space)
+    counts = Statistics()
+    store = _Store(space)
+    store.stats = counts
+    culprit = _maintain_arcs(space,store,_arcs(space))
+
+    #values removed by the propagation of a singleton that passed the test
+    supports = {}
+    queue = [(vname,val) for vname in space.variables
+             for val in store.domains[vname]]
+    queued = set(queue)
+    queue.reverse()
+    while queue and culprit is None:
+        vname, val = queue.pop()
+        queued.discard((vname,val))
+        if not val in store.domains[vname]:
+            continue
+        mark = store.mark()
+        store.narrow(vname,[val])
+        failed = _propagate_arcs(space,store,{},vname)
+        pruned = _pruned(store,mark)
+        store.undo(mark)
+        if failed is None:
+            supports[vname,val] = pruned
+            continue
+
+        #the value is not singleton arc consistent
+        mark = store.mark()
+        store.narrow(vname,[v for v in store.domains[vname] if v != val])
+        if len(store.domains[vname]) == 0:
+            culprit = failed
+            break
+        culprit = _propagate_arcs(space,store,{},vname)
+        deleted = _pruned(store,mark)
+        for key in list(supports):
+            if key in deleted:
+                del supports[key]
+            elif not deleted <= supports[key]:
+                del supports[key]
+                if not key in queued:
+                    queued.add(key)
+                    queue.append(key)
+
+    for vname, values in store.domains.items():
+        space.domains[vname] = DiscreteSet(values)
+    if stats is not None:
+        stats.checks += counts.checks
+        stats.revisions += counts.revisions
+        stats.pruned += size - _size(space)
+        stats.propagation_time += perf_counter() - start
+    return counts.checks
+
+def _pruned(store,mark):
+    """
+    Return the set of variable names and values removed from the domains of
+    the store since mark was obtained
+    """
+    before = {}
+    for vname, values, reasons in store.trail[mark:]:
+        if not vname in before:
+            before[vname] = values
+    pruned = set([])
+    for vname, values in before.items():
+        remaining = set(store.domains[vname])
+        pruned.update((vname,val) for val in values if not val in remaining)
+    return frozenset(pruned)
+
+def bounds_consistency(space,stats=None):
+    """
+    Reduce the IntervalSet domains of the variables of a continuous space,
+    such that the smallest and largest values of every variable are
+    consistent with the domains of the other variables under the Less,
+    LessEqual, Greater, GreaterEqual and Equal relations. Only the bounds of
+    the domains are narrowed, except for Equal, which intersects them. As
+    for arc consistency, the relations on a variable are revised again
+    whenever its domain was narrowed.
+
+    Other constraints are only used for node consistency.
+
+    :param Space space: The space to reduce
+    :param Statistics stats: an optional object to record the work done
+    :returns: the number of revisions performed
+    :rtype: int
+    :raises ValueError: if a domain is not an IntervalSet
+    """
+    space.reindex()
+    if stats is not None:
+        start = perf_counter()
+    counts = Statistics()
+    domains = _interval_domains(space)
+    watch = _watch(space)
+    _bounds(watch,domains,set(c for cs in watch.values() for c in cs),counts)
+    for vname, domain in domains.items():
+        space.domains[vname] = domain
+    if stats is not None:
+        stats.revisions += counts.revisions
+        stats.propagation_time += perf_counter() - start
+    return counts.revisions
+
+_bounded = (Less, LessEqual, Greater, GreaterEqual, Equal)
+
+def _interval_domains(space):
+    """
+    Return a dictionary of variable names to node consistent IntervalSet
+    domains
+    """
+    domains = {}
+    for vname, domain in space.domains.items():
+        if not isinstance(domain,IntervalSet):
+            raise ValueError("Domain of %s is not an IntervalSet" % vname)
+        for const in space.var_constraints[vname]:
+            if isinstance(const.domains.get(vname),IntervalSet):
+                domain = domain.intersection(const.domains[vname])
+        domains[vname] = domain
+    return domains
+
+def _watch(space):
+    """
+    Return a dictionary of variable names to the relations on them that
+    can be propagated by _bounds
+    """
+    watch = dict((vname,[]) for vname in space.variables)
+    for const in space.constraints:
+        if isinstance(const,_bounded) and \
+                all(v in watch for v in const.vnames):
+            for vname in const.vnames:
+                watch[vname].append(const)
+    return watch
+
+def _bounds(watch,domains,worklist,stats):
+    """
+    Narrow the domains in the dictionary to bounds consistency, starting
+    from the relations in worklist and revising the relations on a variable
+    again when its domain was narrowed.
+
+    returns the relation that emptied a domain, or None
+    """
+    while worklist:
+        const = worklist.pop()
+        stats.revisions += 1
+        for vname in _revise_bounds(const,domains):
+            if domains[vname].is_empty():
+                return const
+            for const2 in watch[vname]:
+                if not const2 is const:
+                    worklist.add(const2)
+    return None
+
+def _revise_bounds(const,domains):
+    """
+    Narrow the domains of the variables of the relation
+
+    returns a list of the names of the narrowed variables
+    """
+    if isinstance(const,Equal):
+        both = domains[const.v1].intersection(domains[const.v2])
+        narrowed = []
+        for vname in (const.v1,const.v2):
+            if not _same(domains[vname],both):
+                domains[vname] = both
+                narrowed.append(vname)
+        return narrowed
+    #the smaller and the larger variable
+    if isinstance(const,(Less,LessEqual)):
+        small, large = const.v1, const.v2
+    else:
+        small, large = const.v2, const.v1
+    strict = isinstance(const,(Less,Greater))
+    if domains[small].is_empty() or domains[large].is_empty():
+        return []
+    lower, lower_in, upper, upper_in = _hull(domains[small])
+    lower2, lower2_in, upper2, upper2_in = _hull(domains[large])
+    narrowed = []
+    if upper2 < float("inf"):
+        below = Interval((-float("inf"),upper2),(True,upper2_in and not strict))
+        domain = domains[small].intersection(IntervalSet([below]))
+        if not _same(domain,domains[small]):
+            domains[small] = domain
+            narrowed.append(small)
+    if lower > -float("inf"):
+        above = Interval((lower,float("inf")),(lower_in and not strict,True))
+        domain = domains[large].intersection(IntervalSet([above]))
+        if not _same(domain,domains[large]):
+            domains[large] = domain
+            narrowed.append(large)
+    return narrowed
+
+def _entailed(const,box):
+    """
+    Return whether the constraint is satisfied by all points of the box
+    """
+    if isinstance(const,_bounded) and not isinstance(const,Equal):
+        if isinstance(const,(Less,LessEqual)):
+            small, large = box[const.v1], box[const.v2]
+        else:
+            small, large = box[const.v2], box[const.v1]
+        lower, lower_in, upper, upper_in = _hull(small)
+        lower2, lower2_in, upper2, upper2_in = _hull(large)
+        if upper < lower2:
+            return True
+        if upper > lower2:
+            return False
+        if isinstance(const,(LessEqual,GreaterEqual)):
+            return True
+        return not (upper_in and lower2_in)
+    #other constraints can only be decided for single points
+    label = {}
+    for vname in const.vnames:
+        if not box[vname].is_discrete() or len(box[vname].ints) != 1:
+            return False
+        label[vname] = box[vname].ints[0].get_point()
+    return const.satisfied(label)
+
+def _hull(domain):
+    """
+    Return the smallest and largest values of a non-empty IntervalSet,
+    together with whether they are included
+    """
+    first = domain.ints[0]
+    last = domain.ints[-1]
+    return first.bounds[0], first.included[0], last.bounds[1], last.included[1]
+
+def _same(domain1,domain2):
+    """
+    Return whether two IntervalSets consist of the same intervals
+    """
+    return [(i.bounds,i.included) for i in domain1.ints] == \
+           [(i.bounds,i.included) for i in domain2.ints]
+
+def _arc_consistency(space,revise,stats=None):
+    """
+    Enforce node consistency and then arc consistency, using the function
+    revise(const,vname1,vname2) to reduce the domain of vname1 with respect to
+    vname2, which has to return True if the domain of vname1 was modified.
+
+    If stats is given, the revisions, the values removed from discrete
+    domains and the time spent are added to it.
+    """
+    space.reindex()
+    if stats is not None:
+        start = perf_counter()
+        size = _size(space)
+        revisions = 0
     #enforce node consistency
-    for vname in space.variables:
-        for const in space.constraints:
+    for const in space.constraints:
+        for vname in const.vnames:
             _unary(space,const,vname)
 
-    #assemble work list
-    worklist = set([])
-    for v1 in space.variables:
-        for v2 in space.variables:
-            for const in space.constraints:
-                if _binary(space,const,v1,v2):
-                    for name in arcs[v1]:
-                        worklist.add((v1,name))
-
     #work through work list
+    worklist = _arcs(space)
     while worklist:
-        v1,v2 = worklist.pop()
-        for const in space.constraints:
-            if _binary(space,const,v1,v2):
-                for vname in arcs[v1]:
-                    worklist.add((v1,vname))
+        vname1,vname2,const = worklist.pop()
+        if stats is not None:
+            revisions += 1
+        if revise(const,vname1,vname2):
+            _requeue(space,worklist,vname1,vname2,const)
+
+    if stats is not None:
+        stats.revisions += revisions
+        stats.pruned += size - _size(space)
+        stats.propagation_time += perf_counter() - start
+
+def _size(space):
+    """
+    Return the total number of values in the discrete domains of the space
+    """
+    size = 0
+    for domain in space.domains.values():
+        if domain.is_discrete():
+            size += len(list(domain.iter_members()))
+    return size
+
+def _arcs(space):
+    """
+    Return a set with all arcs of the space. This is pessimistic, we assume
+    that each constraint pairwisely couples all variables it affects
+    """
+    arcs = set([])
+    for const in space.constraints:
+        for vname1,vname2 in product(const.vnames,repeat=2):
+            if vname1 != vname2:
+                arcs.add((vname1,vname2,const))
+    return arcs
+
+def _requeue(space,worklist,vname1,vname2,const):
+    """
+    Add the arcs pointing to vname1 to the worklist after its domain was
+    narrowed by revising it with respect to vname2 under const.
+    """
+    for const2 in space.var_constraints[vname1]:
+        for vname3 in const2.vnames:
+            if vname3 == vname1:
+                continue
+            if const2 is const and vname3 == vname2:
+                continue
+            worklist.add((vname3,vname1,const2))
 
 def _unary(space,const,name):
     """
@@ -87,91 +626,2369 @@ def _unary(space,const,name):
     space.domains[name] = space.domains[name].intersection(values)
     return True
 
-def _binary(space,const,name1,name2):
+def _binary(space,const,name1,name2,counts=None):
     """
     reduce the domain of variable name1 to be two-consistent (arc-consistent)
     with this constraint, i.e. remove those values for the variable name1,
     for which no values for name2 exist such that this pair is consistent
     with the constraint
 
+    if the dictionary counts is given, the number of constraint checks is
+    added to its 'checks' entry.
+
     returns True if the domain of name1 was modified
     """
     if not (name1 in const.vnames and name2 in const.vnames):
         return False
+    checks = 0
     remove = set([])
     for v1 in space.domains[name1].iter_members():
         for v2 in space.domains[name2].iter_members():
+            checks += 1
             if const.consistent({name1 : v1, name2 : v2}):
                 break
         else:
             remove.add(v1)
 
+    if counts is not None:
+        counts['checks'] += checks
+    return _remove(space,name1,remove)
+
+def _binary2001(space,const,name1,name2,values2,last,counts):
+    """
+    like _binary, but resumes the search for supports after the last support
+    recorded in the dictionary last. values2 is the list of all values name2
+    could have had since the supports were recorded.
+
+    returns True if the domain of name1 was modified
+    """
+    if not (name1 in const.vnames and name2 in const.vnames):
+        return False
+    checks = 0
+    domain2 = space.domains[name2]
+    remove = set([])
+    for v1 in space.domains[name1].iter_members():
+        key = (const,name1,v1,name2)
+        start = last.get(key)
+        if start is not None:
+            if values2[start] in domain2:
+                continue
+            start += 1
+        else:
+            start = 0
+        for i in range(start,len(values2)):
+            v2 = values2[i]
+            if not v2 in domain2:
+                continue
+            checks += 1
+            if const.consistent({name1 : v1, name2 : v2}):
+                last[key] = i
+                break
+        else:
+            remove.add(v1)
+
+    counts['checks'] += checks
+    return _remove(space,name1,remove)
+
+def _remove(space,name,remove):
+    """
+    remove the values in remove from the domain of variable name
+
+    returns True if the domain of name was modified
+    """
     if len(remove) > 0:
-        if space.variables[name1].discrete:
+        if space.variables[name].discrete:
             remove = DiscreteSet(remove)
         else:
             remove = IntervalSet.from_values(remove)
 
-        space.domains[name1] = space.domains[name1].difference(remove)
+        space.domains[name] = space.domains[name].difference(remove)
         return True
     else:
         return False
 
-def solve(space,method='backtrack',ordering=None):
+def solve(space,method='backtrack',ordering=None,value_ordering=None,
+          seed=None,nogoods=None,budget=None,stats=None,expand=False,
+          precision=1e-6):
     """
     Generator for all solutions.
 
+    Independent components of the space, see :meth:`Space.components`, are
+    solved separately, and their solutions are combined lazily like in
+    nested loops, with the component of the first variable in the ordering
+    in the outermost loop. This does not change the order of the solutions
+    for a parameter ordering, as the space is only split if the variables
+    of every component are consecutive in it, and it is not split at all
+    with a value ordering. Components
+    whose constraint graph is a tree are solved without backtracking after
+    making them directionally arc consistent, unless an ordering, a value
+    ordering or a nogood store is given.
+
+    If symmetries are declared on the space, only one solution of every
+    class of symmetric solutions is searched. Interchangeable variables are
+    ordered by constraints, and of the interchangeable values that are not
+    yet used by an assigned variable only the smallest is tried. Variable
+    and value symmetries can only be combined with a static ordering, and
+    then some classes may be found more than once.
 
     :param str method: the solution method to employ
-    :param ordering: an optional parameter ordering
-    :type ordering: sequence of parameter names
+    :param ordering: an optional parameter ordering, or the name of a
+                     heuristic to choose the next variable during search
+    :type ordering: sequence of parameter names or str
+    :param str value_ordering: an optional strategy for the order in which
+                               values are tried
+    :param seed: seed for the random number generator used by the "random"
+                 value ordering and by "min-conflicts"
+    :param NogoodStore nogoods: an optional store in which nogoods learned
+                                during search are recorded, and which is
+                                consulted before descending. It can be
+                                reused for further searches in this space
+                                that break its symmetries in the same way.
+    :param Budget budget: optional limits for the search, which also allow
+                          to cancel it. After the search, it tells whether
+                          it finished or was cut off.
+    :param Statistics stats: an optional object to record the work done
+                             during the search
+    :param bool expand: whether to generate all solutions that are
+                        symmetric to the solutions found, instead of one
+                        solution per class
+    :param float precision: the width down to which "branch-and-prune"
+                            bisects domains
 
     Methods:
 
     :"backtrack": simple chronological backtracking
-    :"ac-lookahead": full lookahead
+    :"backjump": conflict-directed backjumping, like backtracking, but
+                 when all values of a variable fail, the search jumps back
+                 to the most recent variable responsible for the failures
+    :"forward-check": forward checking, after every assignment values of
+                      unassigned variables that are inconsistent with it
+                      are removed
+    :"ac-lookahead": full lookahead, maintaining arc consistency after
+                     every assignment
+    :"min-conflicts": local search for a single solution, which starts
+                      from a random labeling and repeatedly gives a
+                      variable of a violated constraint the value that
+                      violates the fewest constraints, see below
+    :"branch-and-prune": search for solution boxes in spaces with
+                         IntervalSet domains, see below
+
+    Heuristics:
+
+    :"mrv": variable with the smallest current domain first
+    :"degree": variable constrained with the most unassigned variables
+               first
+    :"dom/wdeg": variable with the smallest ratio of current domain size
+                 and weighted degree first, where the weight of a
+                 constraint is increased every time it causes a dead end
+
+    Value orderings:
+
+    :None: values in the order of iter_members
+    :"lcv": least constraining value first, i.e. the value that removes the
+            fewest values from the domains of unassigned variables
+    :"phase": phase saving, the value that was assigned to the variable
+              last is tried first
+    :"solution": solution guided, the value of the variable in the last
+                 solution found is tried first
+    :"random": values in random order
+
+    The "min-conflicts" method scales to much larger spaces than the
+    systematic methods, but only finds one solution per component and can
+    not prove that there is none, so on spaces without solutions it only
+    stops when the budget is exceeded. A step changes the value of one
+    variable and only evaluates the constraints on this variable. To escape
+    from local minima, recent values of a variable are tabu and some steps
+    choose a random value. The ordering, the value ordering and the nogood
+    store are not used. Assignments in the budget and the statistics count
+    the steps.
+
+    The "branch-and-prune" method works on spaces of RealVariables, or
+    other variables with IntervalSet domains, and yields dictionaries of
+    variable names to IntervalSets instead of values. The domains are
+    narrowed to bounds consistency under Less, LessEqual, Greater,
+    GreaterEqual and Equal, see :func:`bounds_consistency`. A box is a
+    solution if every point in it satisfies all constraints, otherwise the
+    widest variable of a constraint that is not yet decided is bisected,
+    until it is narrower than precision. Boxes of this size may contain
+    points that violate a constraint, in particular constraints other than
+    the relations above are only decided for single points. The domains of
+    variables with constraints on other variables have to be bounded after
+    propagation, otherwise a ValueError is raised. The ordering, the
+    value ordering and the nogood store are not used. Assignments in the
+    budget and the statistics count the boxes.
+    """
+    for label in _solutions(space,method,ordering,value_ordering,seed,
+                            nogoods,budget,None,stats,expand,precision):
+        yield label
+
+def _solutions(space,method,ordering,value_ordering,seed,nogoods,budget,
+               pause,stats,expand=False,precision=1e-6):
+    """
+    Generator for all solutions, see :func:`solve` for the parameters. If
+    pause is given, None is yielded every pause assignments, so that the
+    caller can do something else in between.
+    """
+    space.reindex()
+    _use_nogoods(nogoods,space,ordering)
+    labels = _solve(_break_symmetries(space,ordering),method,ordering,
+                    value_ordering,seed,nogoods,budget,pause,stats,precision)
+    if stats is not None:
+        labels = _timed(labels,stats)
+    if expand:
+        labels = _expand(labels,space)
+    for label in _budgeted(labels,budget):
+        yield label
+
+def _budgeted(labels,budget):
+    """
+    Generator for the labelings of a generator, which counts the solutions
+    in the budget and stops when it is exceeded. None is passed on.
+    """
+    if budget is None:
+        for label in labels:
+            yield label
+        return
+
+    budget.start()
+    if budget.exceeded():
+        return
+    for label in labels:
+        if budget.stopped is not None:
+            return
+        if label is None:
+            yield None
+            continue
+        budget.found += 1
+        if budget.limit is not None and budget.found >= budget.limit:
+            budget.stopped = 'limit'
+        yield label
+        if budget.stopped is not None:
+            return
+    if budget.stopped is None:
+        budget.finished = True
+
+def _break_symmetries(space,ordering):
+    """
+    Return a copy of the space in which the values of interchangeable
+    variables are ordered by a chain of LessEqual constraints, following
+    the ordering. Together with trying only the smallest unused
+    interchangeable value, this only admits the lexicographically smallest
+    solutions of every class, which is why both only work together if the
+    variables are assigned in a fixed order.
+    """
+    if len(space.variable_symmetries) == 0:
+        return space
+    if isinstance(ordering,basestring) and len(space.value_symmetries) > 0:
+        raise ValueError("Variable and value symmetries can not be broken "
+                         "with a dynamic ordering")
+
+    constraints = list(space.constraints)
+    for vname1, vname2 in _chains(space,ordering):
+        constraints.append(LessEqual(space.variables[vname1],
+                                     space.variables[vname2]))
+    res = Space(list(space.variables.values()),constraints)
+    res.domains.update(space.domains)
+    res.value_symmetries = list(space.value_symmetries)
+    return res
+
+def _chains(space,ordering):
+    """
+    Return the pairs of variable names whose values are ordered to break
+    the variable symmetries of the space, following the ordering
+    """
+    if ordering is None or isinstance(ordering,basestring):
+        ordering = list(space.variables.keys())
+    rank = dict((vname,i) for i,vname in enumerate(ordering))
+    pairs = []
+    for vnames in space.variable_symmetries:
+        chain = sorted(vnames,key=lambda v: rank.get(v,len(rank)))
+        pairs.extend(zip(chain[:-1],chain[1:]))
+    return pairs
+
+def _use_nogoods(nogoods,space,ordering):
+    """
+    Check that the nogoods in the store are valid for a search of the space
+    with the ordering, and record the symmetry breaking of this search in
+    the store. Nogoods learned while symmetries were broken can cut off
+    solutions that another symmetry breaking admits, so they can only be
+    reused by searches that break at least the same symmetries in the same
+    way.
+    """
+    if nogoods is None:
+        return
+    key = set(('variables',) + pair for pair in _chains(space,ordering))
+    for values, vnames in space.value_symmetries:
+        key.add(('values',values,vnames))
+    key = frozenset(key)
+    if len(nogoods) > 0 and not nogoods.symmetries <= key:
+        raise ValueError("The nogoods were learned under a different "
+                         "symmetry breaking")
+    nogoods.symmetries = key
+
+def _expand(labels,space):
+    """
+    Generator for the solutions that are symmetric to the labelings, in
+    which every class of symmetric solutions is only generated once. None
+    is passed on.
+    """
+    vnames = list(space.variables.keys())
+    generators = []
+    for values, scope in space.value_symmetries:
+        for val1, val2 in zip(values[:-1],values[1:]):
+            generators.append(_swap_values(scope,val1,val2))
+    for names in space.variable_symmetries:
+        for vname1, vname2 in zip(names[:-1],names[1:]):
+            generators.append(_swap_variables(vname1,vname2))
+
+    classes = set([])
+    for label in labels:
+        if label is None:
+            yield None
+            continue
+        #the orbit of the labeling under the group of the generators
+        key = tuple(label[v] for v in vnames)
+        orbit = {key : label}
+        queue = [label]
+        while queue:
+            current = queue.pop()
+            for generator in generators:
+                image = generator(current)
+                key = tuple(image[v] for v in vnames)
+                if not key in orbit:
+                    orbit[key] = image
+                    queue.append(image)
+        smallest = min(orbit)
+        if smallest in classes:
+            continue
+        classes.add(smallest)
+        for key in sorted(orbit):
+            yield orbit[key]
+
+def _swap_values(scope,val1,val2):
+    """
+    Return a function that exchanges two values in the variables of scope
+    """
+    swap = {val1 : val2, val2 : val1}
+    def generator(label):
+        image = label.copy()
+        for vname in scope:
+            if label[vname] in swap:
+                image[vname] = swap[label[vname]]
+        return image
+    return generator
+
+def _swap_variables(vname1,vname2):
+    """
+    Return a function that exchanges the values of two variables
+    """
+    def generator(label):
+        image = label.copy()
+        image[vname1], image[vname2] = label[vname2], label[vname1]
+        return image
+    return generator
+
+def _timed(labels,stats):
+    """
+    Generator for the labelings of a generator, which adds the time spent
+    in it and the number of solutions to stats
+    """
+    while True:
+        start = perf_counter()
+        try:
+            label = next(labels)
+        except StopIteration:
+            stats.time += perf_counter() - start
+            return
+        stats.time += perf_counter() - start
+        if label is not None:
+            stats.solutions += 1
+        yield label
+
+def _solve(space,method,ordering,value_ordering,seed,nogoods,budget,pause,
+           stats,precision=1e-6):
+    """
+    Generator for all solutions, see :func:`_solutions` for the parameters
+    """
+    components = space.components()
+    if len(components) > 1 and \
+            _separable(components,ordering,value_ordering):
+        #solve independent parts separately and combine their solutions
+        if ordering is not None and not isinstance(ordering,basestring):
+            #nest the components in the order of their first variable
+            rank = dict((vname,i) for i,vname in enumerate(ordering))
+            components.sort(key=lambda component: min(
+                [rank.get(v,len(rank)) for v in component.variables] +
+                [len(rank)]))
+        streams = []
+        for component in components:
+            streams.append(_solve(component,method,
+                                  _restrict(ordering,component),
+                                  value_ordering,seed,nogoods,budget,
+                                  pause,stats,precision))
+        for label in _product(streams):
+            yield label
+        return
+
+    if method == 'min-conflicts':
+        search = _MinConflicts(space,seed,stats)
+        for label in search.solutions(budget,pause):
+            yield label
+        return
+    elif method == 'branch-and-prune':
+        search = _BranchAndPrune(space,precision,stats)
+        for box in search.solutions(budget,pause):
+            yield box
+        return
+
+    if ordering is None and value_ordering is None and nogoods is None and \
+            method in _methods and space.is_discrete() and \
+            len(space.value_symmetries) == 0:
+        tree = _tree(space)
+        if tree is not None:
+            for label in tree.solutions(budget,pause,stats):
+                yield label
+            return
+
+    search = _searcher(space,method,ordering,value_ordering,seed,nogoods,
+                       stats)
+    if search is None:
+        return
+    search.budget = budget
+    search.pause = pause
+    if len(space.value_symmetries) > 0:
+        search.values = _SymmetricValues(search.values,space)
+    for label in search.solutions({}):
+        yield label
+
+_methods = ('backtrack','backjump','forward-check','ac-lookahead')
+
+def _separable(components,ordering,value_ordering):
+    """
+    Return whether the components can be solved separately without changing
+    the order of the solutions. Nested loops over the components give the
+    order of a search of the whole space with a parameter ordering only if
+    the variables of every component are consecutive in it. Value orderings
+    may depend on the values assigned or found before in other components,
+    or on a random number generator shared by them.
+    """
+    if value_ordering is not None:
+        return False
+    if ordering is None or isinstance(ordering,basestring):
+        return True
+    rank = dict((vname,i) for i,vname in enumerate(ordering))
+    for component in components:
+        if not all(v in rank for v in component.variables):
+            return False
+        ranks = [rank[v] for v in component.variables]
+        if len(ranks) > 0 and max(ranks) - min(ranks) != len(ranks) - 1:
+            return False
+    return True
+
+def _restrict(ordering,space):
+    """
+    Restrict a parameter ordering to the variables of a space
+    """
+    if ordering is None or isinstance(ordering,basestring):
+        return ordering
+    return [v for v in ordering if v in space.variables]
+
+def _product(streams):
+    """
+    Generator for the combinations of the labelings from several
+    generators. The labelings are drawn lazily, and all but those of the
+    first generator are cached to be combined with the following ones.
+    Nothing is yielded unless every generator has at least one labeling.
+    None yielded by a generator to pause is passed on.
+    """
+    streams = [iter(stream) for stream in streams]
+    caches = [[] for stream in streams]
+    for i in range(len(streams)):
+        for pause in _draw(streams,caches,i,0):
+            yield pause
+        if len(caches[i]) == 0:
+            return
+    indices = [0 for stream in streams]
+    while True:
+        label = {}
+        for cache, index in zip(caches,indices):
+            label.update(cache[index])
+        yield label
+        #advance the last generator first, like nested loops
+        i = len(streams) - 1
+        while i > 0:
+            indices[i] += 1
+            for pause in _draw(streams,caches,i,indices[i]):
+                yield pause
+            if len(caches[i]) > indices[i]:
+                break
+            indices[i] = 0
+            i -= 1
+        if i == 0:
+            #the labelings of the first generator are only used once
+            caches[0] = []
+            for pause in _draw(streams,caches,0,0):
+                yield pause
+            if len(caches[0]) == 0:
+                return
+
+def _draw(streams,caches,i,index):
+    """
+    Generator that makes sure the labeling with the given index of the
+    generator i is in its cache, unless the generator has fewer labelings.
+    It yields the None of the generator whenever it pauses.
+    """
+    cache = caches[i]
+    while len(cache) <= index and streams[i] is not None:
+        try:
+            label = next(streams[i])
+        except StopIteration:
+            streams[i] = None
+            break
+        if label is None:
+            yield None
+        else:
+            cache.append(label)
+
+def _searcher(space,method,ordering,value_ordering,seed,nogoods,stats=None,
+              weights=None,shuffle=None,incumbent=None):
+    """
+    Set up a search for solve, see there for the parameters. For a
+    heuristic ordering, weights are the initial constraint weights and
+    shuffle is the seed for breaking ties randomly, see _DynamicOrder. An
+    _Incumbent wraps the propagation of the method to prune labelings that
+    can not improve on it.
+
+    returns a _Search, or None if the space has no solution
     """
     if ordering is None:
         ordering = list(space.variables.keys())
 
     if not space.is_discrete():
         raise ValueError("Can not backtrack on non-discrete space")
-    if method=='backtrack':
-        for label in _backtrack(space,{},ordering):
-            yield label
+    if method in ('backtrack','backjump'):
+        propagate = _no_propagation
+    elif method=='forward-check':
+        propagate = _forward_check
     elif method=='ac-lookahead':
-        for label in _lookahead(space,{},ordering):
-            yield label
+        propagate = _propagate_arcs
     else:
         raise ValueError("Unknown solution method: %s" % method)
+    explain = method=='backjump' or nogoods is not None
+    track = propagate is not _no_propagation or explain
+    if incumbent is not None:
+        incumbent.propagate = propagate
+        propagate = incumbent
 
+    store = _Store(space,explain)
+    store.stats = stats
+    if any(len(domain) == 0 for domain in store.domains.values()):
+        return None
+    if method=='ac-lookahead':
+        if stats is not None:
+            start = perf_counter()
+        culprit = _maintain_arcs(space,store,_arcs(space))
+        if stats is not None:
+            stats.propagation_time += perf_counter() - start
+        if culprit is not None:
+            return None
+    if isinstance(ordering,basestring):
+        order = _DynamicOrder(space,store,ordering,weights,shuffle)
+    else:
+        order = _StaticOrder(ordering)
+    values = _value_ordering(space,value_ordering,seed)
+    if stats is not None:
+        return _Instrumented(space,store,order,values,propagate,stats,
+                             backjump=(method=='backjump'),nogoods=nogoods,
+                             track=track)
+    return _Search(space,store,order,values,propagate,
+                   backjump=(method=='backjump'),nogoods=nogoods,track=track)
 
-def _backtrack(space,label,ordering):
-    level = len(label)
-    if level == len(space.variables):
-        if space.satisfied(label):
-            yield label
-    elif space.consistent(label):
-        vname = ordering[level]
-        newlabel = label.copy()
-        for val in space.domains[vname].iter_members():
-            newlabel[vname] = val
-            for sol in _backtrack(space,newlabel,ordering):
-                yield sol
-
-def _lookahead(space,label,ordering):
-    level = len(label)
-    if len(label) == len(space.variables):
-        if space.satisfied(label):
-            yield label
-    elif space.consistent(label):
-        vname = ordering[level]
-        var = space.variables[vname]
-        newlabel = label.copy()
-        for val in space.domains[vname].iter_members():
-            nspace = Space(list(space.variables.values()),
-                           space.constraints + [FixedValue(var,val)])
-            newlabel[vname] = val
-            ac3(nspace)
-            for sol in _lookahead(nspace,newlabel,ordering):
-                yield sol
+def restart_solve(space,method='backtrack',ordering='dom/wdeg',
+                  value_ordering='random',restarts='luby',cutoff=32,factor=1.5,
+                  seed=None,nogoods=None,budget=None,stats=None):
+    """
+    Search for a single solution with randomized restarts.
+
+    The search is abandoned after a number of dead ends and started again
+    from scratch, with ties in the variable ordering heuristic broken
+    differently, while the values continue in the order of the value
+    ordering. The number of dead ends after which the search restarts grows
+    from run to run, so that the search is still complete. This avoids that
+    a bad decision close to the root takes exponentially long to undo, which
+    makes the time to the first solution much more predictable.
+
+    What was learned in one run is kept for the following ones: the
+    constraint weights of the "dom/wdeg" heuristic, the state of the value
+    ordering, and the nogoods if a nogood store is given.
+
+    Symmetries declared on the space are broken as in :func:`solve`.
+
+    :param Space space: The space to search
+    :param str method: The solution method to employ, see :func:`solve`
+    :param ordering: a parameter ordering, or the name of a heuristic, see
+                     :func:`solve`. Only heuristics are randomized.
+    :type ordering: sequence of parameter names or str
+    :param str value_ordering: the strategy for the order in which values
+                               are tried, see :func:`solve`
+    :param str restarts: the sequence of cutoffs
+    :param int cutoff: the number of dead ends after which the first run
+                       is restarted
+    :param float factor: the factor by which the cutoff grows for geometric
+                         restarts
+    :param seed: seed for the random number generator
+    :param NogoodStore nogoods: an optional store for the nogoods learned
+                                during the runs
+    :param Budget budget: optional limits for all runs together, see
+                          :func:`solve`
+    :param Statistics stats: an optional object to record the work done
+                             during all runs
+    :returns: a solution, or None if there is none or the budget was
+              exceeded
+    :rtype: dict
+
+    Restart strategies:
+
+    :"luby": the cutoff is multiplied by the Luby sequence 1, 1, 2, 1, 1,
+             2, 4, 1, ..., which is within a logarithmic factor of the
+             optimal strategy for unknown runtime distributions
+    :"geometric": the cutoff is multiplied by factor after every run
+    """
+    space.reindex()
+    if not restarts in ('luby','geometric'):
+        raise ValueError("Unknown restart strategy: %s" % restarts)
+    if budget is not None:
+        budget.start()
+    if stats is not None:
+        start = perf_counter()
+    _use_nogoods(nogoods,space,ordering)
+    random = Random(seed)
+    label = {}
+    for component in _break_symmetries(space,ordering).components():
+        solution = _restarts(component,method,_restrict(ordering,component),
+                             value_ordering,restarts,cutoff,factor,random,
+                             nogoods,budget,stats)
+        if solution is None:
+            label = None
+            break
+        label.update(solution)
+    if stats is not None:
+        stats.time += perf_counter() - start
+        if label is not None:
+            stats.solutions += 1
+    if budget is not None and budget.stopped is None:
+        budget.finished = label is None
+        if label is not None:
+            budget.found = 1
+    return label
+
+def _restarts(space,method,ordering,value_ordering,restarts,cutoff,factor,
+              random,nogoods,budget,stats):
+    """
+    Return the first solution of a space found with restarts, see
+    :func:`restart_solve` for the parameters
+    """
+    weights = None
+    values = None
+    run = 0
+    while True:
+        search = _searcher(space,method,ordering,value_ordering,
+                           random.getrandbits(32),nogoods,stats,weights,
+                           random.getrandbits(32))
+        if search is None:
+            return None
+        if isinstance(search.order,_DynamicOrder):
+            weights = search.order.weights
+        if values is None:
+            values = search.values
+        search.values = values
+        if len(space.value_symmetries) > 0:
+            search.values = _SymmetricValues(values,space)
+        search.budget = budget
+        if restarts == 'luby':
+            search.max_failures = int(cutoff*_luby(run))
+        else:
+            search.max_failures = int(cutoff*factor**run)
+        for label in search.solutions({}):
+            return label
+        if not search.restart:
+            return None
+        run += 1
+
+def _luby(i):
+    """
+    Return the element with index i of the Luby sequence 1, 1, 2, 1, 1, 2,
+    4, 1, 1, 2, ...
+    """
+    i += 1
+    while True:
+        #find the smallest k with i <= 2^k - 1
+        k = i.bit_length()
+        if i == 2**k - 1:
+            return 2**(k-1)
+        i -= 2**(k-1) - 1
+
+def optimize(space,objective,sense='min',method='backtrack',ordering=None,
+             value_ordering=None,seed=None,budget=None,stats=None):
+    """
+    Generator for solutions with better and better values of an objective,
+    found by branch and bound.
+
+    The search keeps the value of the best solution found so far. After
+    every assignment and its propagation, the objective is bounded over the
+    remaining domains, see :meth:`~constrainingorder.objectives.Objective.bounds`,
+    and subtrees in which no labeling can improve on the best solution are
+    pruned. Every solution that is yielded is strictly better than the
+    previous one, so the search can be stopped at any time with the best
+    solution so far, and the last solution is optimal if the search
+    finished.
+
+    The space is searched as a whole, because the objective couples its
+    components. Symmetries declared on the space are not used, as the
+    objective need not be invariant under them.
+
+    :param Space space: The space to search
+    :param Objective objective: The objective to optimize
+    :param str sense: "min" to minimize the objective, "max" to maximize it
+    :param str method: The solution method to employ, one of the systematic
+                       methods of :func:`solve`
+    :param ordering: an optional parameter ordering, or the name of a
+                     heuristic, see :func:`solve`
+    :type ordering: sequence of parameter names or str
+    :param str value_ordering: an optional strategy for the order in which
+                               values are tried, see :func:`solve`
+    :param seed: seed for the random number generator used by the "random"
+                 value ordering
+    :param Budget budget: optional limits for the search, see :func:`solve`.
+                          Its limit counts the improving solutions.
+    :param Statistics stats: an optional object to record the work done
+                             during the search
+    :return: generator of solutions
+    """
+    space.reindex()
+    incumbent = _Incumbent(objective,sense)
+    labels = _improvements(space,incumbent,method,ordering,value_ordering,
+                           seed,budget,stats)
+    if stats is not None:
+        labels = _timed(labels,stats)
+    for label in _budgeted(labels,budget):
+        yield label
+
+def _improvements(space,incumbent,method,ordering,value_ordering,seed,
+                  budget,stats):
+    """
+    Generator for the solutions of a branch and bound search, which
+    tightens the incumbent with every solution
+    """
+    search = _searcher(space,method,ordering,value_ordering,seed,None,stats,
+                       incumbent=incumbent)
+    if search is None:
+        return
+    search.budget = budget
+    for label in search.solutions({}):
+        incumbent.improve(label)
+        yield label
+
+class _Incumbent(object):
+    """
+    Propagation for branch and bound, which calls the propagation of the
+    search method and then prunes the labeling if the objective can not
+    improve on the best solution found so far. It is itself the culprit of
+    the dead ends it causes, so that backjumping blames the assigned
+    variables of the objective and those responsible for the domains of
+    the others.
+    """
+    def __init__(self,objective,sense,cost=None):
+        if not sense in ('min','max'):
+            raise ValueError("Unknown optimization sense: %s" % sense)
+        self.objective = objective
+        self.sign = 1 if sense == 'min' else -1
+        "factor turning the objective into a cost to minimize"
+        self.cost = cost
+        "cost of the best solution found so far, or None"
+        self.vnames = objective.vnames
+        self.propagate = _no_propagation
+        "the propagation function of the search method"
+
+    def __call__(self,space,store,label,vname):
+        culprit = self.propagate(space,store,label,vname)
+        if culprit is not None or self.cost is None:
+            return culprit
+        lower, upper = self.objective.bounds(store.domains,label)
+        if self.sign == 1:
+            bound = lower
+        else:
+            bound = -upper
+        if bound >= self.cost:
+            return self
+        return None
+
+    def improves(self,label):
+        """
+        Return whether a solution is better than the best one so far
+        """
+        return self.cost is None or \
+            self.sign*self.objective.value(label) < self.cost
+
+    def improve(self,label):
+        """
+        Make a solution the best one so far
+        """
+        self.cost = self.sign*self.objective.value(label)
+
+def count_solutions(space,method='backtrack',ordering=None):
+    """
+    Count the solutions of a space without enumerating them one by one.
+
+    The space is split into independent components, whose counts are
+    multiplied. Variables that are only affected by constraints on
+    themselves are not searched, instead the count is multiplied by the
+    number of their admissible values. Components whose constraint graph
+    is a tree are counted by dynamic programming from the leaves to the
+    root.
+
+    :param Space space: The space to count the solutions of
+    :param str method: The solution method to employ, see :func:`solve`
+    :param ordering: an optional parameter ordering, or the name of a
+                     heuristic, see :func:`solve`
+    :returns: the number of solutions
+    :rtype: int
+    """
+    space.reindex()
+    if not space.is_discrete():
+        raise ValueError("Can not backtrack on non-discrete space")
+
+    count = 1
+    for component in space.components():
+        if len(component.variables) == 1:
+            vname = list(component.variables.keys())[0]
+            consts = component.constraints
+            if all(_is_unary(const,vname) for const in consts):
+                count *= _count_values(component.domains[vname],vname,consts)
+                if count == 0:
+                    return 0
+                continue
+        tree = _tree(component)
+        if tree is not None:
+            count *= tree.count()
+            if count == 0:
+                return 0
+            continue
+        search = _searcher(component,method,_restrict(ordering,component),
+                           None,None,None)
+        if search is None:
+            return 0
+        count *= search.count({})
+        if count == 0:
+            return 0
+    return count
+
+def _is_unary(const,vname):
+    """
+    Return whether the constraint only affects vname, and can be decided by
+    checking consistency
+    """
+    if not const.consistent_implies_satisfied:
+        return False
+    return len(const.vnames) == 1 and const.vnames[0] == vname
+
+def _count_values(domain,vname,constraints):
+    """
+    Return the number of values in the domain of vname that are consistent
+    with the constraints
+    """
+    count = 0
+    for val in domain.iter_members():
+        label = {vname : val}
+        if all(const.consistent(label) for const in constraints):
+            count += 1
+    return count
+
+def _tree(space):
+    """
+    Return a _Tree for the space if its constraint graph is a tree, i.e. it
+    is connected, all constraints affect one or two of its variables and
+    are decided by checking consistency, and they do not form a cycle.
+
+    returns None otherwise
+    """
+    if len(space.variables) == 0:
+        return None
+    for const in space.constraints:
+        if not const.consistent_implies_satisfied:
+            return None
+        if len(const.vnames) == 0 or len(set(const.vnames)) > 2:
+            return None
+        if not all(v in space.variables for v in const.vnames):
+            return None
+
+    root = list(space.variables.keys())[0]
+    order = [root]
+    parent = {root : None}
+    for vname in order:
+        for const in space.var_constraints[vname]:
+            for vname2 in const.vnames:
+                if vname2 == vname or vname2 == parent[vname]:
+                    continue
+                if vname2 in parent:
+                    #several constraints between the same variables are fine
+                    if parent[vname2] != vname:
+                        return None
+                    continue
+                parent[vname2] = vname
+                order.append(vname2)
+    if len(order) != len(space.variables):
+        return None
+    return _Tree(space,order,parent)
+
+class _Tree(object):
+    """
+    Backtrack free search on a space with a tree structured constraint
+    graph. The variables are ordered breadth first from a root, and the
+    domains are made directionally arc consistent from the leaves towards
+    the root. Then every value of a variable that is consistent with the
+    value of its parent can be extended to a solution.
+    """
+    def __init__(self,space,order,parent):
+        self.order = order
+        "variables in breadth first order"
+        self.parent = parent
+        "dictionary of variable names to the name of their parent"
+        self.edges = {}
+        "dictionary of variable names to the constraints with their parent"
+        self.children = dict((vname,[]) for vname in order)
+        "dictionary of variable names to the names of their children"
+        for vname in order[1:]:
+            pname = parent[vname]
+            self.children[pname].append(vname)
+            self.edges[vname] = [c for c in space.var_constraints[vname]
+                                 if pname in c.vnames]
+
+        self.domains = {}
+        "dictionary of variable names to lists of admissible values"
+        for vname in order:
+            consts = space.var_constraints[vname]
+            values = []
+            for val in space.domains[vname].iter_members():
+                label = {vname : val}
+                if all(const.consistent(label) for const in consts):
+                    values.append(val)
+            self.domains[vname] = values
+        for vname in reversed(order[1:]):
+            pname = parent[vname]
+            self.domains[pname] = [pval for pval in self.domains[pname]
+                                   if len(self._support(vname,pval)) > 0]
+        if any(len(values) == 0 for values in self.domains.values()):
+            self.domains = None
+
+    def _support(self,vname,pval):
+        """
+        Return the values of vname that are consistent with the value pval
+        of its parent
+        """
+        pname = self.parent[vname]
+        values = []
+        for val in self.domains[vname]:
+            label = {vname : val, pname : pval}
+            if all(const.consistent(label) for const in self.edges[vname]):
+                values.append(val)
+        return values
+
+    def solutions(self,budget=None,pause=None,stats=None):
+        """
+        Generator for all solutions, which stops when the optional budget is
+        exceeded, and yields None every pause assignments. The assignments
+        are counted in the optional stats.
+        """
+        if self.domains is None:
+            return
+        order = self.order
+        label = {}
+        nodes = 0
+        stack = [iter(self.domains[order[0]])]
+        while stack:
+            if budget is not None and budget.exceeded():
+                return
+            if pause is not None and nodes >= pause:
+                nodes = 0
+                yield None
+            try:
+                val = next(stack[-1])
+            except StopIteration:
+                stack.pop()
+                continue
+            nodes += 1
+            if budget is not None:
+                budget.nodes += 1
+            if stats is not None:
+                stats.nodes += 1
+                stats.level(len(stack)-1).nodes += 1
+            label[order[len(stack)-1]] = val
+            if len(stack) == len(order):
+                yield label.copy()
+                continue
+            vname = order[len(stack)]
+            stack.append(iter(self._support(vname,label[self.parent[vname]])))
+
+    def count(self):
+        """
+        Return the number of solutions
+        """
+        if self.domains is None:
+            return 0
+        counts = {}
+        for vname in reversed(self.order):
+            counts[vname] = {}
+            for val in self.domains[vname]:
+                count = 1
+                for child in self.children[vname]:
+                    count *= sum(counts[child][v]
+                                 for v in self._support(child,val))
+                counts[vname][val] = count
+        return sum(counts[self.order[0]].values())
+
+class _MinConflicts(object):
+    """
+    Local search on complete labelings. In every step, a variable is picked
+    at random from the variables of violated constraints and gets the value
+    that violates the fewest of its constraints. The violated constraints
+    and their number per variable are updated incrementally, so a step only
+    evaluates the constraints of the variable it changes.
+
+    To escape from local minima, giving a variable back a value it had in
+    the last tenure steps is tabu, unless this leads to fewer violated
+    constraints than ever before, and with probability walk the variable
+    gets a random value instead.
+    """
+    tenure = 10
+    "number of steps for which an old value of a variable is tabu"
+    walk = 0.05
+    "probability of a random step"
+
+    def __init__(self,space,seed=None,stats=None):
+        if not space.is_discrete():
+            raise ValueError("Can not search locally on non-discrete space")
+        self.random = Random(seed)
+        self.stats = stats
+        self.unsatisfiable = False
+        "whether a constraint without variables is violated"
+        #node consistent domains
+        self.domains = {}
+        "dictionary of variable names to lists of admissible values"
+        for vname in space.variables:
+            values = list(space.domains[vname].iter_members())
+            for const in space.var_constraints[vname]:
+                values = [v for v in values if v in const.domains[vname]]
+            if len(values) == 0:
+                self.unsatisfiable = True
+            self.domains[vname] = values
+        #unary constraints are satisfied by the domains
+        self.constraints = {}
+        "dictionary of variable names to the constraints that need to be evaluated"
+        for vname in space.variables:
+            self.constraints[vname] = [c for c in space.var_constraints[vname]
+                                       if len(c.vnames) > 1]
+        for const in space.constraints:
+            if len(const.vnames) == 0 and not const.satisfied({}):
+                self.unsatisfiable = True
+        self.violated = set([])
+        "constraints violated by the current labeling"
+        self.conflicts = dict.fromkeys(space.variables,0)
+        "dictionary of variable names to the number of their violated constraints"
+        self.conflicted = []
+        "variables with violated constraints, in random access order"
+        self.position = {}
+        "dictionary of variables with violated constraints to their index in conflicted"
+        self.tabu = {}
+        "dictionary of variable names and values to the step until which they are tabu"
+
+    def solutions(self,budget=None,pause=None):
+        """
+        Generator for the first solution found, which stops when the
+        optional budget is exceeded, and yields None every pause steps.
+        Without a budget it does not stop on spaces without solutions.
+        """
+        if self.unsatisfiable:
+            return
+        stats = self.stats
+        random = self.random
+        label = dict((vname,random.choice(values))
+                     for vname,values in self.domains.items())
+        for vname in label:
+            for const in self.constraints[vname]:
+                if const.vnames[0] == vname:
+                    self._evaluate(const,label)
+        best = len(self.violated)
+        steps = 0
+        while len(self.violated) > 0:
+            if budget is not None and budget.exceeded():
+                return
+            if pause is not None and steps > 0 and steps % pause == 0:
+                yield None
+            steps += 1
+            if budget is not None:
+                budget.nodes += 1
+            if stats is not None:
+                stats.nodes += 1
+            vname = random.choice(self.conflicted)
+            val = self._choose(vname,label,steps,best)
+            if val is None:
+                continue
+            self.tabu[vname,label[vname]] = steps + self.tenure
+            label[vname] = val
+            for const in self.constraints[vname]:
+                self._evaluate(const,label)
+            best = min(best,len(self.violated))
+        yield label
+
+    def _choose(self,vname,label,steps,best):
+        """
+        Return the new value for vname, or None if it can not change
+        """
+        random = self.random
+        current = label[vname]
+        values = [val for val in self.domains[vname] if val != current]
+        if len(values) == 0:
+            return None
+        if random.random() < self.walk:
+            return random.choice(values)
+        others = len(self.violated) - self.conflicts[vname]
+        chosen = []
+        fewest = None
+        for val in values:
+            label[vname] = val
+            violated = 0
+            for const in self.constraints[vname]:
+                if not self._satisfied(const,label):
+                    violated += 1
+            if self.tabu.get((vname,val),0) > steps and \
+                    others + violated >= best:
+                continue
+            if fewest is None or violated < fewest:
+                fewest = violated
+                chosen = [val]
+            elif violated == fewest:
+                chosen.append(val)
+        label[vname] = current
+        if len(chosen) == 0:
+            return None
+        return random.choice(chosen)
+
+    def _satisfied(self,const,label):
+        if self.stats is not None:
+            self.stats.checks += 1
+        return const.satisfied(label)
+
+    def _evaluate(self,const,label):
+        """
+        Update the violated constraints after a variable of const changed
+        """
+        violated = not self._satisfied(const,label)
+        if violated == (const in self.violated):
+            return
+        if violated:
+            self.violated.add(const)
+            delta = 1
+        else:
+            self.violated.remove(const)
+            delta = -1
+        for vname in const.vnames:
+            self.conflicts[vname] += delta
+            if self.conflicts[vname] == 0:
+                #remove from the conflicted variables by swapping with the last
+                index = self.position.pop(vname)
+                last = self.conflicted.pop()
+                if last != vname:
+                    self.conflicted[index] = last
+                    self.position[last] = index
+            elif delta == 1 and self.conflicts[vname] == 1:
+                self.position[vname] = len(self.conflicted)
+                self.conflicted.append(vname)
+
+class _BranchAndPrune(object):
+    """
+    Branch and prune search on boxes, i.e. dictionaries of variable names to
+    IntervalSet domains. Every box is narrowed to bounds consistency. If all
+    constraints are satisfied by every point of the box, or no variable of
+    an undecided constraint is wider than the precision, the box is a
+    solution. Otherwise the widest of these variables is bisected, and both
+    halves are searched depth first.
+    """
+    def __init__(self,space,precision,stats=None):
+        if not precision > 0:
+            raise ValueError("The precision has to be positive")
+        self.precision = precision
+        self.stats = stats
+        self.domains = _interval_domains(space)
+        "node consistent domains of the space"
+        self.watch = _watch(space)
+        "dictionary of variable names to the relations on them"
+        self.constraints = [c for c in space.constraints if len(c.vnames) > 1]
+        "constraints that have to be decided for every box"
+        self.unsatisfiable = False
+        "whether a constraint without variables is violated"
+        for const in space.constraints:
+            if len(const.vnames) == 0 and not const.satisfied({}):
+                self.unsatisfiable = True
+
+    def solutions(self,budget=None,pause=None):
+        """
+        Generator for the solution boxes, which stops when the optional
+        budget is exceeded, and yields None every pause boxes.
+        """
+        if self.unsatisfiable:
+            return
+        stats = self.stats
+        counts = stats if stats is not None else Statistics()
+        box = dict(self.domains)
+        worklist = set(c for cs in self.watch.values() for c in cs)
+        if any(d.is_empty() for d in box.values()) or \
+                _bounds(self.watch,box,worklist,counts) is not None:
+            return
+        inf = float("inf")
+        for const in self.constraints:
+            for vname in const.vnames:
+                lower, lower_in, upper, upper_in = _hull(box[vname])
+                if lower == -inf or upper == inf:
+                    raise ValueError("Domain of %s is not bounded" % vname)
+        stack = [box]
+        nodes = 0
+        while stack:
+            if budget is not None and budget.exceeded():
+                return
+            if pause is not None and nodes >= pause:
+                nodes = 0
+                yield None
+            box = stack.pop()
+            nodes += 1
+            if budget is not None:
+                budget.nodes += 1
+            if stats is not None:
+                stats.nodes += 1
+            vname = self._branch(box)
+            if vname is None:
+                yield box
+                continue
+            for half in reversed(self._bisect(box[vname])):
+                if half.is_empty():
+                    continue
+                child = dict(box)
+                child[vname] = half
+                if _bounds(self.watch,child,set(self.watch[vname]),
+                           counts) is None:
+                    stack.append(child)
+
+    def _branch(self,box):
+        """
+        Return the variable to bisect, or None if the box is a solution
+        """
+        widest = None
+        width = self.precision
+        for const in self.constraints:
+            if _entailed(const,box):
+                continue
+            for vname in const.vnames:
+                lower, lower_in, upper, upper_in = _hull(box[vname])
+                if upper - lower > width:
+                    widest = vname
+                    width = upper - lower
+        return widest
+
+    def _bisect(self,domain):
+        """
+        Return the two halves of the domain
+        """
+        lower, lower_in, upper, upper_in = _hull(domain)
+        inf = float("inf")
+        middle = 0.5*(lower + upper)
+        left = IntervalSet([Interval((-inf,middle),(True,True))])
+        right = IntervalSet([Interval((middle,inf),(False,True))])
+        return domain.intersection(left), domain.intersection(right)
+
+class _Search(object):
+    """
+    Depth first search on the domains of a store. After assigning a value to
+    a variable, propagate(space,store,label,vname) is called to reduce the
+    domains of the store, which has to return the constraint that caused a
+    dead end, or None.
+
+    With backjumping, the search records for every variable the set of
+    earlier variables that are in conflict with its values, and when all
+    values failed, it jumps back to the most recent of them.
+
+    With a nogood store, the labeling of the conflict set of a variable for
+    which all values failed is recorded as a nogood. As this nogood is
+    violated by the current labeling, learning implies backjumping.
+
+    If max_nodes is set, the search stops after this many assignments and
+    leaves the part of the tree it did not explore in frontier. If
+    max_failures is set, the search stops after this many dead ends and sets
+    restart. If a budget
+    is set, the search stops as soon as it is exceeded. If pause is set,
+    None is yielded every pause assignments.
+
+    Without track, the assignments are not recorded in the store and the
+    ordering is not told about changed domains, which is only correct if
+    propagate never narrows a domain and no explanations are needed, as in
+    plain backtracking. Conflict sets are only kept for backjumping.
+    """
+    def __init__(self,space,store,order,values,propagate,backjump=False,
+                 nogoods=None,track=True):
+        self.space = space
+        self.store = store
+        self.order = order
+        self.values = values
+        self.propagate = propagate
+        self.check = _inconsistent
+        "function returning a constraint violated by an assignment, or None"
+        self.nogoods = nogoods
+        self.backjump = backjump or nogoods is not None
+        self.track = track
+        "whether the store and the ordering follow the assignments"
+        self.conflict = None
+        "conflict set of the subtree that was searched last"
+        self.found = 0
+        "number of solutions found so far"
+        self.nodes = 0
+        "number of assignments tried so far"
+        self.max_nodes = None
+        "number of assignments after which the search stops, or None"
+        self.failures = 0
+        "number of dead ends so far"
+        self.max_failures = None
+        "number of dead ends after which the search stops, or None"
+        self.restart = False
+        "whether the search stopped because of max_failures"
+        self.budget = None
+        "Budget that is checked at every node, or None"
+        self.pause = None
+        "number of assignments after which the search yields None, or None"
+        self.frontier = []
+        "labelings whose subtrees were not explored when the search stopped"
+        self.final = []
+        "constraints that need to be checked for complete labelings"
+        for const in space.constraints:
+            #all other constraints were checked for consistency once all
+            #their variables were assigned, which implies satisfaction
+            if not const.consistent_implies_satisfied:
+                self.final.append(const)
+            elif len(const.vnames) == 0:
+                self.final.append(const)
+            elif not all(v in space.variables for v in const.vnames):
+                self.final.append(const)
+
+    def solutions(self,label):
+        """
+        Generator for all solutions extending the labeling
+        """
+        for label in self._labelings(label):
+            if label is None:
+                yield None
+            else:
+                yield label.copy()
+
+    def count(self,label):
+        """
+        Return the number of solutions extending the labeling, without
+        copying them
+        """
+        count = 0
+        for _ in self._labelings(label):
+            count += 1
+        return count
+
+    def _labelings(self,label):
+        """
+        Generator for the solutions extending the labeling, which yields
+        label itself whenever it is a solution, and None to pause. The
+        search keeps the open nodes on an explicit stack instead of
+        recursing, so the depth of the search is not limited by the
+        recursion limit, and yielding a solution does not pass through every
+        level.
+        """
+        space = self.space
+        store = self.store
+        order = self.order
+        nvars = len(space.variables)
+        if len(label) == nvars:
+            if self._leaf(label):
+                yield label
+            return
+        budget = self.budget
+        pause = self.pause
+        track = self.track
+        if pause is not None:
+            resume = self.nodes + pause
+        stack = [self._open(label)]
+        while stack:
+            node = stack[-1]
+            vname = node.vname
+            if node.descended:
+                #returning from the subtree below the current value
+                node.descended = False
+                if self.backjump:
+                    if not vname in self.conflict:
+                        #none of the values of vname can resolve the
+                        #conflict, jump back over it
+                        node.conflict = self.conflict
+                        node.jumped = True
+                        order.update(store.undo(node.mark))
+                        self._close(node,label)
+                        stack.pop()
+                        continue
+                    node.conflict.update(self.conflict)
+                if track:
+                    order.update(store.undo(node.mark))
+
+            #find the next value that passes the checks
+            for val in node.values:
+                if budget is not None and budget.exceeded():
+                    return
+                if self.max_failures is not None and \
+                        self.failures >= self.max_failures:
+                    self.restart = True
+                    return
+                if pause is not None and self.nodes >= resume:
+                    resume = self.nodes + pause
+                    yield None
+                if self._try(node,label,val):
+                    break
+                self.failures += 1
+                if track:
+                    order.update(store.undo(node.mark))
+            else:
+                self._close(node,label)
+                stack.pop()
+                continue
+
+            node.descended = True
+            if len(label) == nvars:
+                if self._leaf(label):
+                    yield label
+            elif self.max_nodes is not None and self.nodes >= self.max_nodes:
+                self.frontier = self._split(stack,label)
+                return
+            else:
+                stack.append(self._open(label))
+
+    def assume(self,label,vname,val):
+        """
+        Assign val to vname before the search starts, so that solutions
+        only explores the subtree below this assignment.
+
+        returns False if the assignment leads to a dead end
+        """
+        store = self.store
+        self.order.assign(vname)
+        if not val in store.domains[vname]:
+            return False
+        node = _Node(vname,store.mark(),self.found)
+        if store.explain:
+            node.decision = (vname,)
+        node.conflict = set([])
+        return self._try(node,label,val)
+
+    def _split(self,stack,label):
+        """
+        Return the unexplored part of the search tree below the nodes on the
+        stack as a list of labelings, in the order the search would have
+        explored them.
+        """
+        assigned = set(node.vname for node in stack)
+        prefix = dict((v,val) for v,val in label.items() if v not in assigned)
+        levels = []
+        for node in stack:
+            level = []
+            for val in node.values:
+                sub = prefix.copy()
+                sub[node.vname] = val
+                level.append(sub)
+            levels.append(level)
+            prefix[node.vname] = label[node.vname]
+        frontier = [prefix]
+        for level in reversed(levels):
+            frontier.extend(level)
+        return frontier
+
+    def _open(self,label):
+        """
+        Select the next variable and return a new node for it
+        """
+        store = self.store
+        vname = self.order.select(store,label)
+        self.order.assign(vname)
+        node = _Node(vname,store.mark(),self.found)
+        node.values = iter(self.values.order(store,label,vname))
+        if self.backjump:
+            node.decision = (vname,)
+            #the values removed by propagation are part of the conflict
+            node.conflict = set(store.reasons[vname])
+            node.conflict.update(self.values.explain(label,vname))
+        return node
+
+    def _try(self,node,label,val):
+        """
+        Assign val to the variable of node and propagate
+
+        returns True if the search should descend, otherwise the conflict of
+        node is updated
+        """
+        space = self.space
+        store = self.store
+        vname = node.vname
+        self.nodes += 1
+        if self.budget is not None:
+            self.budget.nodes += 1
+        label[vname] = val
+        self.values.assign(vname,val)
+        if self.track:
+            store.narrow(vname,[val],node.decision)
+        failed = None
+        if self.nogoods is not None:
+            nogood = self.nogoods.find(label,vname)
+            if nogood is not None:
+                failed = [v for v,value in nogood]
+        if failed is None:
+            culprit = self.check(space,label,vname)
+            if culprit is None:
+                culprit = self.propagate(space,store,label,vname)
+            if culprit is not None:
+                self.order.conflict(culprit)
+                failed = self._explain(culprit,label)
+        if self.track:
+            self.order.update(store.changed(node.mark))
+        if failed is None:
+            return True
+        if self.backjump:
+            node.conflict.update(failed)
+        return False
+
+    def _leaf(self,label):
+        """
+        Check a complete labeling
+
+        returns True if it is a solution
+        """
+        culprit = _unsatisfied(self.final,label)
+        if culprit is None:
+            self.values.solution(label)
+            self.found += 1
+            if self.backjump:
+                #all variables are responsible for a solution, so after a
+                #solution the search has to backtrack chronologically
+                self.conflict = set(label)
+            return True
+        self.failures += 1
+        if self.backjump:
+            self.conflict = self._explain(culprit,label)
+        return False
+
+    def _close(self,node,label):
+        """
+        Unassign the variable of the node after all its values were tried,
+        or the search jumped over it
+        """
+        vname = node.vname
+        if vname in label:
+            #no value is assigned if none was left to try
+            del label[vname]
+        self.order.unassign(vname)
+        if not self.backjump:
+            return
+        node.conflict.discard(vname)
+        self.conflict = node.conflict
+        if self.nogoods is not None and not node.jumped:
+            if self.found == node.found and len(node.conflict) > 0:
+                self.nogoods.add(dict((v,label[v]) for v in node.conflict))
+
+    def _explain(self,culprit,label):
+        """
+        Return the set of assigned variables responsible for a dead end
+        caused by the constraint culprit
+        """
+        if not self.store.explain:
+            return ()
+        conflict = set([])
+        for vname in culprit.vnames:
+            if vname in label:
+                conflict.add(vname)
+            else:
+                conflict.update(self.store.reasons[vname])
+        return conflict
+
+class _Instrumented(_Search):
+    """
+    Search that records the work it does in a Statistics object. The plain
+    _Search is used when no statistics are requested, so that it does not
+    pay for them.
+    """
+    def __init__(self,space,store,order,values,propagate,stats,**kwargs):
+        _Search.__init__(self,space,store,order,values,self._propagate,
+                         **kwargs)
+        self.stats = stats
+        self.inner = propagate
+        "the propagation function that is timed"
+        self.check = self._check
+
+    def _try(self,node,label,val):
+        depth = len(label)
+        if node.vname in label:
+            #the previous value of the node is still assigned
+            depth -= 1
+        self.stats.nodes += 1
+        self.stats.level(depth).nodes += 1
+        return _Search._try(self,node,label,val)
+
+    def _close(self,node,label):
+        self.stats.backtracks += 1
+        self.stats.level(len(label)-1).backtracks += 1
+        _Search._close(self,node,label)
+
+    def _check(self,space,label,vname):
+        """
+        Like _inconsistent, but counting the constraint checks
+        """
+        checks = 0
+        culprit = None
+        for const in space.var_constraints[vname]:
+            checks += 1
+            if not const.consistent(label):
+                culprit = const
+                break
+        self.stats.checks += checks
+        self.stats.level(len(label)-1).checks += checks
+        return culprit
+
+    def _propagate(self,space,store,label,vname):
+        """
+        Call the propagation function, and record the time it takes, the
+        checks and revisions it performs and the values it removes
+        """
+        stats = self.stats
+        level = stats.level(len(label)-1)
+        checks = stats.checks
+        revisions = stats.revisions
+        mark = store.mark()
+        start = perf_counter()
+        culprit = self.inner(space,store,label,vname)
+        elapsed = perf_counter() - start
+        stats.propagation_time += elapsed
+        level.propagation_time += elapsed
+        level.checks += stats.checks - checks
+        level.revisions += stats.revisions - revisions
+        pruned = 0
+        seen = set([])
+        for vname2,values,reasons in store.trail[mark:]:
+            if not vname2 in seen:
+                seen.add(vname2)
+                pruned += len(values) - len(store.domains[vname2])
+        stats.pruned += pruned
+        level.pruned += pruned
+        return culprit
+
+class _Node(object):
+    """
+    A node of the search tree on the stack of the search
+    """
+    __slots__ = ['vname','mark','found','values','decision','conflict',
+                 'jumped','descended']
+    def __init__(self,vname,mark,found):
+        self.vname = vname
+        "name of the variable assigned at this node"
+        self.mark = mark
+        "mark of the store before the assignment"
+        self.found = found
+        "number of solutions found before this node"
+        self.values = None
+        "iterator over the values that remain to be tried"
+        self.decision = None
+        "reason recorded for the narrowing of the assigned variable"
+        self.conflict = None
+        "conflict set of the node"
+        self.jumped = False
+        "whether the search jumped over the node"
+        self.descended = False
+        "whether the search is in the subtree below the current value"
+
+def _unsatisfied(constraints,label):
+    """
+    Return a constraint that is not satisfied by the labeling, or None
+    """
+    for const in constraints:
+        if not const.satisfied(label):
+            return const
+    return None
+
+def _inconsistent(space,label,vname):
+    """
+    Return a constraint with which the labeling is inconsistent after
+    assigning vname, or None. Only the constraints affecting vname are
+    checked, as the others were consistent before.
+    """
+    for const in space.var_constraints[vname]:
+        if not const.consistent(label):
+            return const
+    return None
+
+def _no_propagation(space,store,label,vname):
+    return None
+
+def _forward_check(space,store,label,vname):
+    """
+    Remove the values of unassigned variables that are inconsistent with the
+    labeling under a constraint affecting the variable vname.
+
+    returns the constraint that emptied a domain, or None
+    """
+    for const in space.var_constraints[vname]:
+        reason = None
+        if store.explain:
+            reason = [v for v in const.vnames if v in label]
+        for vname2 in const.vnames:
+            if vname2 in label:
+                continue
+            values = store.domains[vname2]
+            keep = []
+            for val in values:
+                label[vname2] = val
+                if const.consistent(label):
+                    keep.append(val)
+            del label[vname2]
+            if store.stats is not None:
+                store.stats.checks += len(values)
+            if len(keep) == 0:
+                return const
+            elif len(keep) < len(values):
+                store.narrow(vname2,keep,reason)
+    return None
+
+def _propagate_arcs(space,store,label,vname):
+    """
+    Reestablish arc consistency after the domain of vname was narrowed
+
+    returns the constraint that emptied a domain, or None
+    """
+    worklist = set([])
+    _requeue(space,worklist,vname,None,None)
+    return _maintain_arcs(space,store,worklist)
+
+def _maintain_arcs(space,store,worklist):
+    """
+    Establish arc consistency in the store, starting from the arcs in the
+    worklist.
+
+    returns the constraint that emptied a domain, or None
+    """
+    while worklist:
+        vname1,vname2,const = worklist.pop()
+        if _revise(store,const,vname1,vname2):
+            if len(store.domains[vname1]) == 0:
+                return const
+            _requeue(space,worklist,vname1,vname2,const)
+    return None
+
+def _revise(store,const,name1,name2):
+    """
+    Like _binary, but operating on the domains in a store
+
+    returns True if the domain of name1 was modified
+    """
+    values1 = store.domains[name1]
+    values2 = store.domains[name2]
+    checks = 0
+    keep = []
+    for v1 in values1:
+        for v2 in values2:
+            checks += 1
+            if const.consistent({name1 : v1, name2 : v2}):
+                keep.append(v1)
+                break
+    if store.stats is not None:
+        store.stats.checks += checks
+        store.stats.revisions += 1
+    if len(keep) < len(values1):
+        if store.explain:
+            store.narrow(name1,keep,store.reasons[name2])
+        else:
+            store.narrow(name1,keep)
+        return True
+    return False
+
+class Budget(object):
+    """
+    Limits for the work done by :func:`solve`. A budget is also a token to
+    cancel a running search, and after the search it tells whether the
+    search finished or why it was cut off. The limits are checked at every
+    node of the search tree.
+    """
+    def __init__(self,limit=None,max_nodes=None,deadline=None):
+        """
+        Create a new Budget
+
+        :param int limit: The maximum number of solutions
+        :param int max_nodes: The maximum number of assignments
+        :param float deadline: The maximum time in seconds after the search
+                               started
+        """
+        self.limit = limit
+        "maximum number of solutions, or None"
+        self.max_nodes = max_nodes
+        "maximum number of assignments, or None"
+        self.deadline = deadline
+        "maximum time in seconds after the search started, or None"
+        self.found = 0
+        "number of solutions found"
+        self.nodes = 0
+        "number of assignments tried"
+        self.finished = False
+        "whether the search explored the whole space"
+        self.stopped = None
+        "why the search was cut off, 'limit', 'nodes', 'deadline' or 'cancelled'"
+        self.cancelled = False
+        "whether the search was cancelled"
+        self._end = None
+
+    def cancel(self):
+        """
+        Cancel the search, it stops at the next node
+        """
+        self.cancelled = True
+
+    def start(self):
+        """
+        Reset the counters and start the clock for the deadline
+        """
+        self.found = 0
+        self.nodes = 0
+        self.finished = False
+        self.stopped = None
+        if self.deadline is not None:
+            self._end = monotonic() + self.deadline
+
+    def exceeded(self):
+        """
+        Check whether the search has to stop, and record why in stopped
+
+        :rtype: bool
+        """
+        if self.stopped is not None:
+            return True
+        if self.cancelled:
+            self.stopped = 'cancelled'
+        elif self.max_nodes is not None and self.nodes >= self.max_nodes:
+            self.stopped = 'nodes'
+        elif self.limit is not None and self.found >= self.limit:
+            self.stopped = 'limit'
+        elif self._end is not None and monotonic() >= self._end:
+            self.stopped = 'deadline'
+        return self.stopped is not None
+
+class Statistics(object):
+    """
+    Counters for the work done by :func:`solve` and the propagation
+    functions. They are updated as the work is done, so they can be read
+    during the search as well as after it. The same counters are kept
+    separately for the nodes at every depth of the search tree.
+    """
+    def __init__(self):
+        """
+        Create a new Statistics object with all counters set to zero
+        """
+        self.nodes = 0
+        "number of assignments tried"
+        self.backtracks = 0
+        "number of variables left after all their values were tried"
+        self.checks = 0
+        "number of constraint checks"
+        self.revisions = 0
+        "number of arc revisions"
+        self.pruned = 0
+        "number of values removed from domains by propagation"
+        self.pairs = 0
+        "number of pairs of values removed by path consistency"
+        self.solutions = 0
+        "number of solutions found"
+        self.time = 0.
+        "time in seconds spent in the search, including propagation"
+        self.propagation_time = 0.
+        "time in seconds spent in propagation"
+        self.levels = {}
+        "dictionary of depths to Statistics for the nodes at this depth"
+
+    def level(self,depth):
+        """
+        Return the Statistics for the nodes at a depth of the search tree
+
+        :param int depth: The number of variables assigned before the node
+        :rtype: Statistics
+        """
+        if not depth in self.levels:
+            self.levels[depth] = Statistics()
+        return self.levels[depth]
+
+    def search_time(self):
+        """
+        Return the time in seconds spent in the search without propagation
+
+        :rtype: float
+        """
+        return self.time - self.propagation_time
+
+class NogoodStore(object):
+    """
+    A database of nogoods, i.e. partial labelings that can not be extended
+    to a solution. Nogoods are indexed by the assignments they contain, so
+    that after an assignment only the nogoods containing it need to be
+    checked. If the number of nogoods exceeds the capacity, the least
+    recently used nogood is evicted.
+
+    Nogoods learned while symmetries were broken are only valid under the
+    same symmetry breaking. Reusing the store in a search that breaks them
+    differently, e.g. with another ordering, raises a ValueError.
+    """
+    def __init__(self,capacity=10000):
+        """
+        Create a new NogoodStore
+
+        :param int capacity: The maximum number of nogoods to keep
+        """
+        self.capacity = capacity
+        "maximum number of nogoods"
+        self.nogoods = OrderedDict()
+        "nogoods as frozensets of name value pairs, least recently used first"
+        self.index = {}
+        "dictionary of name value pairs to the nogoods containing them"
+        self.symmetries = frozenset([])
+        "symmetry breaking under which the nogoods were learned"
+
+    def add(self,nogood):
+        """
+        Record a nogood.
+
+        :param dict nogood: A partial labeling that can not be extended to a
+                            solution
+        """
+        key = frozenset(nogood.items())
+        if key in self.nogoods:
+            self._touch(key)
+            return
+        self.nogoods[key] = None
+        for assignment in key:
+            self.index.setdefault(assignment,set([])).add(key)
+        if len(self.nogoods) > self.capacity:
+            evicted, _ = self.nogoods.popitem(last=False)
+            for assignment in evicted:
+                self.index[assignment].discard(evicted)
+                if len(self.index[assignment]) == 0:
+                    del self.index[assignment]
+
+    def find(self,label,vname):
+        """
+        Return a nogood that is contained in the labeling and contains the
+        assignment of vname, or None.
+
+        :param dict label: A dictionary with parameter names and values
+        :param str vname: The name of the variable assigned last
+        """
+        for key in self.index.get((vname,label[vname]),()):
+            for name, value in key:
+                if not (name in label and label[name] == value):
+                    break
+            else:
+                self._touch(key)
+                return key
+        return None
+
+    def _touch(self,key):
+        del self.nogoods[key]
+        self.nogoods[key] = None
+
+    def __len__(self):
+        return len(self.nogoods)
+
+class _Store(object):
+    """
+    Mutable store for the domains of a discrete space during search, with a
+    trail to undo modifications on backtracking. Domains are lists of values
+    in the order of iter_members, so they are only sorted once.
+    """
+    def __init__(self,space,explain=False):
+        self.domains = {}
+        "dictionary of variable names to lists of admissible values"
+        self.trail = []
+        "list of variable names and the domains they had before narrowing"
+        self.explain = explain
+        "whether to record the reasons for the narrowing of domains"
+        self.stats = None
+        "Statistics to which propagation adds its checks, or None"
+        self.reasons = {}
+        "dictionary of variable names to the assigned variables that are responsible for the values missing from their domain"
+        for vname,domain in space.domains.items():
+            values = list(domain.iter_members())
+            #enforce node consistency
+            for const in space.var_constraints[vname]:
+                values = [v for v in values if v in const.domains[vname]]
+            self.domains[vname] = values
+            self.reasons[vname] = frozenset([])
+
+    def mark(self):
+        """
+        Return a mark for the current state of the store, to which it can be
+        reverted with undo.
+        """
+        return len(self.trail)
+
+    def narrow(self,vname,values,reason=None):
+        """
+        Replace the domain of the variable by the list of values, reason is
+        an optional sequence of the assigned variables that are responsible
+        for the removed values.
+        """
+        self.trail.append((vname,self.domains[vname],self.reasons[vname]))
+        self.domains[vname] = values
+        if reason is not None:
+            self.reasons[vname] = self.reasons[vname].union(reason)
+
+    def changed(self,mark):
+        """
+        Return a list with the names of the variables whose domains were
+        narrowed since mark was obtained
+        """
+        return [entry[0] for entry in self.trail[mark:]]
+
+    def undo(self,mark):
+        """
+        Revert all modifications since mark was obtained
+
+        returns a list with the names of the variables whose domains were
+        restored
+        """
+        restored = []
+        while len(self.trail) > mark:
+            vname,values,reasons = self.trail.pop()
+            self.domains[vname] = values
+            self.reasons[vname] = reasons
+            restored.append(vname)
+        return restored
+
+class _StaticOrder(object):
+    """
+    Variable ordering that selects variables in a fixed order
+    """
+    def __init__(self,ordering):
+        self.ordering = ordering
+
+    def select(self,store,label):
+        """
+        Return the name of the next variable to assign
+        """
+        return self.ordering[len(label)]
+
+    def assign(self,vname):
+        """
+        Notify the ordering that vname is assigned
+        """
+        pass
+
+    def unassign(self,vname):
+        """
+        Notify the ordering that vname is no longer assigned
+        """
+        pass
+
+    def update(self,vnames):
+        """
+        Notify the ordering that the domains of the variables have changed
+        """
+        pass
+
+    def conflict(self,const):
+        """
+        Notify the ordering that const caused a dead end
+        """
+        pass
+
+class _DynamicOrder(_StaticOrder):
+    """
+    Variable ordering that selects the unassigned variable with the smallest
+    key under a heuristic. The keys are kept in a heap, which is updated
+    incrementally when domains, assignments or constraint weights change.
+    Outdated entries are skipped when they reach the top of the heap.
+
+    The constraint weights can be given to continue with the weights
+    learned in an earlier search, and ties are broken in random order if a
+    seed for shuffling is given.
+    """
+    def __init__(self,space,store,heuristic,weights=None,shuffle=None):
+        if not heuristic in ('mrv','degree','dom/wdeg'):
+            raise ValueError("Unknown ordering heuristic: %s" % heuristic)
+        self.space = space
+        self.store = store
+        self.heuristic = heuristic
+        #ties are broken by the order of the variables in the space
+        vnames = list(space.variables)
+        if shuffle is not None:
+            Random(shuffle).shuffle(vnames)
+        self.rank = dict((vname,i) for i,vname in enumerate(vnames))
+        self.assigned = set([])
+        #weighted number of constraints on a variable that affect other
+        #unassigned variables, with all weights being one for 'degree'
+        if weights is None or heuristic != 'dom/wdeg':
+            weights = dict((const,1) for const in space.constraints)
+        self.weights = weights
+        self.unassigned = dict((const,len(const.vnames))
+                               for const in space.constraints)
+        self.degree = {}
+        for vname in space.variables:
+            self.degree[vname] = 0
+            for const in space.var_constraints[vname]:
+                if len(const.vnames) > 1:
+                    self.degree[vname] += self.weights[const]
+        self.version = dict.fromkeys(space.variables,0)
+        self._rebuild()
+
+    def _key(self,vname):
+        if self.heuristic == 'mrv':
+            return len(self.store.domains[vname])
+        elif self.heuristic == 'degree':
+            return -self.degree[vname]
+        elif self.degree[vname] == 0:
+            return float('inf')
+        else:
+            return len(self.store.domains[vname])/float(self.degree[vname])
+
+    def _push(self,vname):
+        if vname in self.assigned:
+            return
+        self.version[vname] += 1
+        entry = (self._key(vname),self.rank[vname],vname,self.version[vname])
+        heappush(self.heap,entry)
+        if len(self.heap) > 4*len(self.rank) + 16:
+            self._rebuild()
+
+    def _rebuild(self):
+        self.heap = []
+        for vname in self.space.variables:
+            if not vname in self.assigned:
+                self.version[vname] += 1
+                self.heap.append((self._key(vname),self.rank[vname],
+                                  vname,self.version[vname]))
+        heapify(self.heap)
+
+    def select(self,store,label):
+        while True:
+            key, rank, vname, version = heappop(self.heap)
+            if version == self.version[vname] and not vname in self.assigned:
+                return vname
+
+    def _change_degree(self,const,vname,others,delta):
+        #the constraint stops or starts contributing to the degree of the
+        #variables for which vname was the last or is the first other
+        #unassigned variable, no matter whether they are assigned themselves
+        for vname2 in const.vnames:
+            if vname2 == vname:
+                continue
+            if vname2 in self.assigned:
+                unassigned = self.unassigned[const]
+            else:
+                unassigned = self.unassigned[const] - 1
+            if unassigned == others:
+                self.degree[vname2] += delta
+                self._push(vname2)
+
+    def assign(self,vname):
+        self.assigned.add(vname)
+        if self.heuristic == 'mrv':
+            return
+        for const in self.space.var_constraints[vname]:
+            self.unassigned[const] -= 1
+            self._change_degree(const,vname,0,-self.weights[const])
+
+    def unassign(self,vname):
+        if self.heuristic != 'mrv':
+            for const in self.space.var_constraints[vname]:
+                self.unassigned[const] += 1
+                self._change_degree(const,vname,1,self.weights[const])
+        self.assigned.remove(vname)
+        self._push(vname)
+
+    def update(self,vnames):
+        if self.heuristic == 'degree':
+            return
+        for vname in vnames:
+            self._push(vname)
+
+    def conflict(self,const):
+        if self.heuristic != 'dom/wdeg' or not const in self.weights:
+            #only constraints of the space are weighted, not the bound of
+            #an optimization
+            return
+        self.weights[const] += 1
+        for vname in const.vnames:
+            others = self.unassigned[const]
+            if not vname in self.assigned:
+                others -= 1
+            if others > 0:
+                self.degree[vname] += 1
+                self._push(vname)
+
+def _value_ordering(space,strategy,seed):
+    """
+    Return the value ordering for the name of the strategy
+    """
+    if strategy is None:
+        return _ValueOrder()
+    elif strategy == 'lcv':
+        return _LeastConstrainingValue(space)
+    elif strategy == 'phase':
+        return _PhaseSaving()
+    elif strategy == 'solution':
+        return _SolutionGuided()
+    elif strategy == 'random':
+        return _RandomValues(seed)
+    else:
+        raise ValueError("Unknown value ordering: %s" % strategy)
+
+class _ValueOrder(object):
+    """
+    Value ordering that tries the values in the order of the store
+    """
+    def order(self,store,label,vname):
+        """
+        Return the values of the variable vname in the order in which they
+        should be tried
+        """
+        return store.domains[vname]
+
+    def assign(self,vname,value):
+        """
+        Notify the value ordering that value is assigned to vname
+        """
+        pass
+
+    def solution(self,label):
+        """
+        Notify the value ordering that label is a solution
+        """
+        pass
+
+    def explain(self,label,vname):
+        """
+        Return the assigned variables responsible for values of vname that
+        are not tried
+        """
+        return ()
+
+class _SymmetricValues(_ValueOrder):
+    """
+    Value ordering that removes symmetric values from the values of another
+    value ordering. Of the interchangeable values that are not used by any
+    assigned variable, only the smallest is tried, as the others lead to
+    symmetric subtrees.
+    """
+    def __init__(self,values,space):
+        self.values = values
+        self.symmetries = {}
+        "dictionary of variable names to their value symmetries"
+        for values, scope in space.value_symmetries:
+            for vname in scope:
+                self.symmetries.setdefault(vname,[]).append((values,scope))
+
+    def order(self,store,label,vname):
+        values = self.values.order(store,label,vname)
+        for symmetric, scope in self.symmetries.get(vname,()):
+            used = set(label[v] for v in scope if v in label and v != vname)
+            for first in symmetric:
+                if not first in used:
+                    break
+            else:
+                continue
+            values = [val for val in values if val == first or val in used
+                      or not val in symmetric]
+        return values
+
+    def assign(self,vname,value):
+        self.values.assign(vname,value)
+
+    def solution(self,label):
+        self.values.solution(label)
+
+    def explain(self,label,vname):
+        culprits = set(self.values.explain(label,vname))
+        for symmetric, scope in self.symmetries.get(vname,()):
+            culprits.update(v for v in scope if v in label and v != vname
+                            and label[v] in symmetric)
+        return culprits
+
+class _LeastConstrainingValue(_ValueOrder):
+    """
+    Value ordering that tries the values first that remove the fewest values
+    from the domains of the unassigned variables.
+    """
+    def __init__(self,space):
+        self.space = space
+
+    def order(self,store,label,vname):
+        values = store.domains[vname]
+        if len(values) < 2:
+            return values
+        removed = {}
+        for val in values:
+            label[vname] = val
+            count = 0
+            for const in self.space.var_constraints[vname]:
+                for vname2 in const.vnames:
+                    if vname2 in label:
+                        continue
+                    for val2 in store.domains[vname2]:
+                        label[vname2] = val2
+                        if not const.consistent(label):
+                            count += 1
+                    del label[vname2]
+            removed[val] = count
+        del label[vname]
+        return sorted(values,key=lambda val: removed[val])
+
+class _PhaseSaving(_ValueOrder):
+    """
+    Value ordering that tries the value first that was assigned last to a
+    variable
+    """
+    def __init__(self):
+        self.phase = {}
+
+    def order(self,store,label,vname):
+        values = store.domains[vname]
+        if not vname in self.phase:
+            return values
+        preferred = self.phase[vname]
+        if len(values) < 2 or values[0] == preferred or \
+                not preferred in values:
+            return values
+        return [preferred] + [val for val in values if val != preferred]
+
+    def assign(self,vname,value):
+        self.phase[vname] = value
+
+class _SolutionGuided(_PhaseSaving):
+    """
+    Value ordering that tries the value first that a variable has in the
+    last solution found
+    """
+    def assign(self,vname,value):
+        pass
+
+    def solution(self,label):
+        self.phase.update(label)
+
+class _RandomValues(_ValueOrder):
+    """
+    Value ordering that tries the values in random order
+    """
+    def __init__(self,seed):
+        self.random = Random(seed)
+
+    def order(self,store,label,vname):
+        values = list(store.domains[vname])
+        self.random.shuffle(values)
+        return values
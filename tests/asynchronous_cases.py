@@ -0,0 +1,106 @@
+"""
+Tests for the asyncio API, which needs Python 3.6 or newer, see
+test_asynchronous
+"""
+import unittest
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from constrainingorder import Space
+from constrainingorder.solver import solve, Budget
+from constrainingorder.asynchronous import asolve, asolve_in_executor
+from constrainingorder.sets import *
+from constrainingorder.variables import *
+from constrainingorder.constraints import *
+from problems import queens
+
+def collect(solutions,limit=None):
+    async def run():
+        res = []
+        async for sol in solutions:
+            res.append(sol)
+            if limit is not None and len(res) >= limit:
+                break
+        await solutions.aclose()
+        return res
+    return asyncio.run(run())
+
+class TestAsolve(unittest.TestCase):
+    def test_asolve(self):
+        space = queens(6)
+        sols = list(solve(space))
+        self.assertEqual(collect(asolve(space,interval=5)),sols)
+
+    def test_yields_to_loop(self):
+        space = queens(6)
+        ticks = []
+        async def ticker():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+        async def run():
+            task = asyncio.ensure_future(ticker())
+            res = [sol async for sol in asolve(space,interval=10)]
+            task.cancel()
+            return res
+        res = asyncio.run(run())
+        self.assertEqual(len(res),4)
+        self.assertTrue(len(ticks) > 10)
+
+    def test_budget(self):
+        space = queens(6)
+        budget = Budget(limit=2)
+        self.assertEqual(len(collect(asolve(space,budget=budget))),2)
+        self.assertEqual(budget.stopped,'limit')
+
+class TestAsolveInExecutor(unittest.TestCase):
+    def test_thread(self):
+        space = queens(6)
+        sols = list(solve(space))
+        budget = Budget()
+        with ThreadPoolExecutor(1) as executor:
+            res = collect(asolve_in_executor(space,executor,maxsize=1,
+                                             budget=budget))
+        self.assertEqual(res,sols)
+        self.assertTrue(budget.finished)
+
+    def test_cancel(self):
+        space = queens(8)
+        budget = Budget()
+        with ThreadPoolExecutor(1) as executor:
+            res = collect(asolve_in_executor(space,executor,maxsize=1,
+                                             budget=budget),limit=3)
+        self.assertEqual(len(res),3)
+        self.assertEqual(budget.stopped,'cancelled')
+
+    def test_process(self):
+        space = queens(6)
+        sols = list(solve(space))
+        budget = Budget()
+        with ProcessPoolExecutor(1) as executor:
+            res = collect(asolve_in_executor(space,executor,budget=budget))
+        self.assertEqual(res,sols)
+        self.assertTrue(budget.finished)
+        self.assertEqual(budget.found,4)
+
+    def test_default_executor(self):
+        #more searches than threads in the default executor
+        space = queens(6)
+        sols = list(solve(space))
+        async def consume():
+            return [sol async for sol in asolve_in_executor(space,maxsize=1)]
+        async def run():
+            loop = asyncio.get_event_loop()
+            loop.set_default_executor(ThreadPoolExecutor(2))
+            return await asyncio.wait_for(
+                asyncio.gather(*[consume() for i in range(5)]),10)
+        for res in asyncio.run(run()):
+            self.assertEqual(res,sols)
+
+    def test_process_cancel(self):
+        space = queens(8)
+        budget = Budget()
+        with ProcessPoolExecutor(1) as executor:
+            res = collect(asolve_in_executor(space,executor,maxsize=1,
+                                             budget=budget),limit=3)
+        self.assertEqual(len(res),3)
+        self.assertEqual(budget.stopped,'cancelled')
@@ -0,0 +1,67 @@
+"""
+Problems shared by the tests
+"""
+from itertools import product
+from constrainingorder import Space
+from constrainingorder.sets import DiscreteSet
+from constrainingorder.variables import DiscreteVariable
+from constrainingorder.constraints import Constraint, DiscreteBinaryRelation
+
+class QueensConstraint(Constraint):
+    """
+    n-ary constraint ensuring that no two queens can attack each other, as in
+    the custom constraints tutorial
+    """
+    def __init__(self,queens):
+        Constraint.__init__(self,dict((var,var.domain) for var in queens))
+    def _conflict(self,val1,val2):
+        if val1[0] == val2[0]:
+            return True
+        if val1[0] - val1[1] == val2[0] - val2[1]:
+            return True
+        if val1[0] + val1[1] == val2[0] + val2[1]:
+            return True
+    def satisfied(self,lab):
+        for v1,v2 in product(self.vnames,repeat=2):
+            if v1 == v2:
+                continue
+            if v1 not in lab or v2 not in lab:
+                return False
+            if self._conflict(lab[v1],lab[v2]):
+                return False
+        return True
+    def consistent(self,lab):
+        for v1,v2 in product(self.vnames,repeat=2):
+            if v1 not in lab or v2 not in lab or v1 == v2:
+                continue
+            if self._conflict(lab[v1],lab[v2]):
+                return False
+        return True
+
+def nary_queens(n):
+    """
+    n queens problem with a single n-ary constraint, returns the variables
+    and the constraint
+    """
+    variables = []
+    for i in range(n):
+        domain = DiscreteSet([(j,i) for j in range(n)])
+        variables.append(DiscreteVariable(str(i),domain=domain))
+    return variables, QueensConstraint(variables)
+
+def queens(n,prefix=''):
+    """
+    n queens problem with built-in constraints, so that the space can be
+    sent to worker processes
+    """
+    variables = []
+    for i in range(n):
+        variables.append(DiscreteVariable(prefix + str(i),domain=DiscreteSet(range(n))))
+    constraints = []
+    for i, j in product(range(n),repeat=2):
+        if i >= j:
+            continue
+        tuples = [(a,b) for a,b in product(range(n),repeat=2)
+                  if a != b and abs(a - b) != j - i]
+        constraints.append(DiscreteBinaryRelation(variables[i],variables[j],tuples))
+    return Space(variables,constraints)
@@ -0,0 +1,6 @@
+import sys
+
+#the asyncio API uses async generators, which older versions of Python can
+#not even parse
+if sys.version_info >= (3,6):
+    from asynchronous_cases import *
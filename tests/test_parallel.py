@@ -0,0 +1,77 @@
+import unittest
+from constrainingorder import Space
+from constrainingorder.solver import solve, optimize
+from constrainingorder.parallel import parallel_solve, parallel_optimize
+from constrainingorder.parallel import _subproblem
+from constrainingorder.sets import *
+from constrainingorder.variables import *
+from constrainingorder.constraints import *
+from constrainingorder.objectives import LinearObjective
+from problems import queens
+
+def _key(label):
+    return tuple(sorted(label.items()))
+
+class TestParallel(unittest.TestCase):
+    def test_parallel(self):
+        space = queens(6)
+        sols = set(_key(sol) for sol in solve(space))
+        res = [_key(sol) for sol in parallel_solve(space,workers=2)]
+        self.assertEqual(len(res),4)
+        self.assertEqual(set(res),sols)
+
+    def test_split(self):
+        space = queens(7)
+        sols = set(_key(sol) for sol in solve(space,method='forward-check'))
+        res = [_key(sol) for sol in
+               parallel_solve(space,workers=3,method='forward-check',
+                              ordering='mrv',max_nodes=5)]
+        self.assertEqual(len(res),len(sols))
+        self.assertEqual(set(res),sols)
+
+    def test_components(self):
+        #two independent queens problems
+        first = queens(5)
+        second = queens(4,'b')
+        variables = list(first.variables.values())
+        variables += list(second.variables.values())
+        space = Space(variables,first.constraints + second.constraints)
+        sols = set(_key(sol) for sol in solve(space))
+        res = [_key(sol) for sol in parallel_solve(space,workers=2)]
+        self.assertEqual(len(res),20)
+        self.assertEqual(set(res),sols)
+
+    def test_subproblem(self):
+        space = queens(6)
+        options = ('backtrack',None,None,None)
+        sols = [_key(sol) for sol in solve(space)]
+        #solving the frontier returned by a stopped search in order gives
+        #the remaining solutions in the original order
+        res = []
+        pending = [{}]
+        while pending:
+            solutions, frontier = _subproblem(space,pending.pop(0),options,7)
+            res.extend(_key(sol) for sol in solutions)
+            pending = frontier + pending
+        self.assertEqual(res,sols)
+
+    def test_no_solution(self):
+        space = queens(3)
+        self.assertEqual(list(parallel_solve(space,workers=2)),[])
+
+    def test_optimize(self):
+        space = queens(7)
+        variables = list(space.variables.values())
+        objective = LinearObjective(
+            dict((v,(-1)**i*(i+1)) for i,v in enumerate(variables)))
+        for sense in ['min','max']:
+            best = list(optimize(space,objective,sense))[-1]
+            res = [objective.value(sol) for sol in
+                   parallel_optimize(space,objective,sense,workers=3,
+                                     ordering='mrv',max_nodes=5)]
+            self.assertEqual(res[-1],objective.value(best))
+            if sense == 'min':
+                self.assertEqual(res,sorted(res,reverse=True))
+            else:
+                self.assertEqual(res,sorted(res))
+            self.assertEqual(len(set(res)),len(res))
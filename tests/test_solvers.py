@@ -1,10 +1,41 @@
 import unittest
+from itertools import product
 from sys import float_info
+from random import Random
 from constrainingorder import Space
-from constrainingorder.solver import solve, _unary, _binary
+from constrainingorder.solver import solve, propagate, ac3, ac2001, NogoodStore
+from constrainingorder.solver import count_solutions, Budget, Statistics
+from constrainingorder.solver import restart_solve, pc2, sac, bounds_consistency
+from constrainingorder.solver import optimize
+from constrainingorder.solver import _unary, _binary, _tree, _luby, _searcher
 from constrainingorder.sets import *
 from constrainingorder.variables import *
 from constrainingorder.constraints import *
+from constrainingorder.objectives import Objective, LinearObjective
+from problems import nary_queens, queens
+
+class CountingNonEqual(NonEqual):
+    """
+    Inequality relation that counts how often it is evaluated
+    """
+    def __init__(self,var1,var2):
+        NonEqual.__init__(self,var1,var2)
+        self.count = 0
+    def relation(self,val1,val2):
+        self.count += 1
+        return val1 != val2
+
+def chain(variables):
+    """
+    Relations that allow every pair of values, but connect the variables
+    into one component
+    """
+    constraints = []
+    for var1, var2 in zip(variables[:-1],variables[1:]):
+        tuples = list(product(var1.domain.iter_members(),
+                              var2.domain.iter_members()))
+        constraints.append(DiscreteBinaryRelation(var1,var2,tuples))
+    return constraints
 
 class TestSolvers(unittest.TestCase):
     def setUp(self):
@@ -14,21 +45,25 @@ class TestSolvers(unittest.TestCase):
     def test_empty(self):
         space = Space([self.x,self.y],[])
         self.assertEqual(len(list(solve(space,method='backtrack'))),12)
+        self.assertEqual(len(list(solve(space,method='forward-check'))),12)
         self.assertEqual(len(list(solve(space,method='ac-lookahead'))),12)
 
     def test_all_different(self):
         space = Space([self.x,self.z],[AllDifferent([self.x,self.z])])
         self.assertEqual(len(list(solve(space,method='backtrack'))),12)
+        self.assertEqual(len(list(solve(space,method='forward-check'))),12)
         self.assertEqual(len(list(solve(space,method='ac-lookahead'))),12)
 
     def test_equal(self):
         space = Space([self.x,self.z],[Equal(self.x,self.z)])
         self.assertEqual(len(list(solve(space,method='backtrack'))),4)
+        self.assertEqual(len(list(solve(space,method='forward-check'))),4)
         self.assertEqual(len(list(solve(space,method='ac-lookahead'))),4)
 
     def test_less(self):
         space = Space([self.x,self.z],[Less(self.x,self.z)])
         self.assertEqual(len(list(solve(space,method='backtrack'))),6)
+        self.assertEqual(len(list(solve(space,method='forward-check'))),6)
         self.assertEqual(len(list(solve(space,method='ac-lookahead'))),6)
 
     def test_equal_domain(self):
@@ -37,8 +72,714 @@ class TestSolvers(unittest.TestCase):
             Domain(self.x,DiscreteSet([1,3,6]))
         ])
         self.assertEqual(len(list(solve(space,method='backtrack'))),2)
+        self.assertEqual(len(list(solve(space,method='forward-check'))),2)
         self.assertEqual(len(list(solve(space,method='ac-lookahead'))),2)
 
+    def test_no_solution(self):
+        y = DiscreteVariable('y',domain=DiscreteSet([1,2,3,5]))
+        space = Space([self.x,y,self.z],[
+            AllDifferent([self.x,y,self.z]),
+            Domain(self.z,DiscreteSet([1,2])),
+            Less(self.x,self.z),
+            Less(y,self.z)
+        ])
+        for method in ['backtrack','forward-check','ac-lookahead']:
+            self.assertEqual(len(list(solve(space,method=method))),0)
+
+    def test_empty_domain(self):
+        #node consistency empties the domain of a before the search starts
+        a, b, c = [DiscreteVariable(n,domain=DiscreteSet([1,2]))
+                   for n in 'abc']
+        space = Space([a,b,c],[
+            Domain(a,DiscreteSet([3])),
+            NonEqual(a,b),
+            NonEqual(b,c),
+            NonEqual(a,c)
+        ])
+        for method in ['backtrack','backjump','forward-check','ac-lookahead']:
+            for ordering in [None,['c','b','a'],'mrv']:
+                self.assertEqual(list(solve(space,method,ordering)),[])
+                self.assertEqual(count_solutions(space,method,ordering),0)
+            self.assertEqual(list(solve(space,method,nogoods=NogoodStore())),
+                             [])
+
+    def test_same_solutions(self):
+        variables, cnst = nary_queens(6)
+        space = Space(variables,[cnst])
+        sols1 = [sol.copy() for sol in solve(space,method='backtrack')]
+        sols2 = [sol.copy() for sol in solve(space,method='ac-lookahead')]
+        sols3 = [sol.copy() for sol in solve(space,method='forward-check')]
+        self.assertEqual(len(sols1),4)
+        self.assertEqual(sols1,sols2)
+        self.assertEqual(sols1,sols3)
+
+    def test_lookahead_domains(self):
+        space = Space([self.x,self.z],[Less(self.x,self.z)])
+        list(solve(space,method='ac-lookahead'))
+        #the domains of the space are not modified
+        self.assertEqual(len(space.domains['x'].elements),4)
+
+    def test_heuristics(self):
+        variables, cnst = nary_queens(6)
+        space = Space(variables,[cnst])
+        sols = [sol.copy() for sol in solve(space)]
+        for method in ['backtrack','forward-check','ac-lookahead']:
+            for ordering in ['mrv','degree','dom/wdeg']:
+                res = [s.copy() for s in solve(space,method,ordering)]
+                self.assertEqual(len(res),len(sols))
+                for sol in res:
+                    self.assertTrue(sol in sols)
+        self.assertRaises(ValueError,lambda: list(solve(space,ordering='foo')))
+
+    def test_weighted_degree(self):
+        #the weighted degrees of dom/wdeg are updated incrementally, check
+        #them against a recomputation during and after searches with many
+        #dead ends and jumps
+        space = queens(6)
+        def degrees(order):
+            res = {}
+            for vname in space.variables:
+                res[vname] = 0
+                for const in space.var_constraints[vname]:
+                    if any(v != vname and not v in order.assigned
+                           for v in const.vnames):
+                        res[vname] += order.weights[const]
+            return res
+        for method in ['backtrack','backjump','forward-check']:
+            search = _searcher(space,method,'dom/wdeg',None,None,NogoodStore())
+            for sol in search.solutions({}):
+                self.assertEqual(search.order.degree,degrees(search.order))
+            self.assertEqual(search.order.assigned,set([]))
+            self.assertTrue(sum(search.order.weights.values()) >
+                            len(space.constraints))
+            self.assertEqual(search.order.degree,degrees(search.order))
+
+    def test_mrv(self):
+        space = Space([self.x,self.y,self.z],[
+            FixedValue(self.z,3),
+            Less(self.x,self.z)
+        ])
+        sols = list(solve(space,method='forward-check',ordering='mrv'))
+        #z is fixed, so it is assigned first and x is narrowed to 1 and 2,
+        #y is unconstrained and assigned last
+        self.assertEqual([(s['x'],s['y']) for s in sols],
+            [(1,'a'),(1,'b'),(1,'c'),(2,'a'),(2,'b'),(2,'c')])
+
+    def test_value_orderings(self):
+        variables, cnst = nary_queens(6)
+        space = Space(variables,[cnst])
+        sols = [sol.copy() for sol in solve(space)]
+        for method in ['backtrack','forward-check','ac-lookahead']:
+            for values in ['lcv','phase','solution','random']:
+                res = [s.copy() for s in solve(space,method,
+                                               value_ordering=values)]
+                self.assertEqual(len(res),len(sols))
+                for sol in res:
+                    self.assertTrue(sol in sols)
+        self.assertRaises(ValueError,
+                          lambda: list(solve(space,value_ordering='foo')))
+
+    def test_lcv(self):
+        space = Space([self.x,self.z],[Less(self.x,self.z)])
+        sols = list(solve(space,value_ordering='lcv'))
+        #x = 1 leaves the most values for z
+        self.assertEqual([(s['x'],s['z']) for s in sols[:3]],
+                         [(1,2),(1,3),(1,5)])
+
+    def test_random(self):
+        variables, cnst = nary_queens(6)
+        space = Space(variables,[cnst])
+        sols1 = [s.copy() for s in solve(space,value_ordering='random',seed=2)]
+        sols2 = [s.copy() for s in solve(space,value_ordering='random',seed=2)]
+        self.assertEqual(sols1,sols2)
+
+    def test_backjump(self):
+        variables, cnst = nary_queens(6)
+        space = Space(variables,[cnst])
+        sols1 = [sol.copy() for sol in solve(space,method='backtrack')]
+        sols2 = [sol.copy() for sol in solve(space,method='backjump')]
+        self.assertEqual(sols1,sols2)
+        for method in ['backtrack','backjump']:
+            self.assertEqual(len(list(solve(space,method,'mrv'))),4)
+
+    def test_backjump_culprit(self):
+        #a and f can not be different, and the variables in between are
+        #irrelevant for this conflict
+        variables = [DiscreteVariable('a',domain=DiscreteSet([1,2]))]
+        for name in 'bcde':
+            variables.append(DiscreteVariable(name,domain=DiscreteSet([1,2,3])))
+        variables.append(DiscreteVariable('f',domain=DiscreteSet([1])))
+        counts = []
+        for method in ['backtrack','backjump']:
+            cnst = CountingNonEqual(variables[0],variables[-1])
+            space = Space(variables,[cnst] + chain(variables[:-1]))
+            sols = list(solve(space,method,[v.name for v in variables]))
+            self.assertEqual(len(sols),81)
+            counts.append(cnst.count)
+        self.assertTrue(counts[1] < counts[0])
+
+    def test_nogoods(self):
+        variables, cnst = nary_queens(6)
+        space = Space(variables,[cnst])
+        sols = [sol.copy() for sol in solve(space)]
+        for method in ['backtrack','forward-check','ac-lookahead']:
+            nogoods = NogoodStore()
+            res = [s.copy() for s in solve(space,method,nogoods=nogoods)]
+            self.assertEqual(res,sols)
+            self.assertTrue(len(nogoods) > 0)
+
+    def test_nogood_reuse(self):
+        #c and f can not be different, so c = 1 is a nogood that is learned
+        #once and then found again for every value of a and b
+        variables = []
+        for name in 'abcde':
+            variables.append(DiscreteVariable(name,domain=DiscreteSet([1,2,3])))
+        variables.append(DiscreteVariable('f',domain=DiscreteSet([1])))
+        counts = []
+        for nogoods in [None,NogoodStore()]:
+            cnst = CountingNonEqual(variables[2],variables[-1])
+            space = Space(variables,[cnst] + chain(variables[:-1]))
+            sols = list(solve(space,'backjump',[v.name for v in variables],
+                              nogoods=nogoods))
+            self.assertEqual(len(sols),162)
+            counts.append(cnst.count)
+        self.assertTrue(counts[1] < counts[0])
+
+    def test_deep(self):
+        #more variables than the recursion limit
+        variables = []
+        for i in range(1500):
+            domain = DiscreteSet([1,2])
+            variables.append(DiscreteVariable(str(i),domain=domain))
+        space = Space(variables,[Less(variables[0],variables[-1])])
+        for method in ['backtrack','forward-check','ac-lookahead']:
+            sol = next(solve(space,method))
+            self.assertEqual(len(sol),1500)
+            self.assertEqual((sol['0'],sol['1499']),(1,2))
+
+    def test_incremental_checks(self):
+        variables = []
+        for name in 'abcdef':
+            variables.append(DiscreteVariable(name,domain=DiscreteSet([1,2])))
+        cnst = CountingNonEqual(variables[0],variables[1])
+        space = Space(variables,[cnst])
+        ordering = [v.name for v in variables]
+        self.assertEqual(len(list(solve(space,ordering=ordering))),32)
+        #only checked when a or b are assigned, and not again for solutions
+        self.assertEqual(cnst.count,4)
+
+    def test_final_check(self):
+        class Odd(Constraint):
+            #consistent does not check anything, so complete labelings
+            #need to be checked for satisfaction
+            def __init__(self,variables):
+                Constraint.__init__(self,dict((v,v.domain) for v in variables))
+            def satisfied(self,lab):
+                return sum(lab[v] for v in self.vnames) % 2 == 1
+            def consistent(self,lab):
+                return True
+        space = Space([self.x,self.z],[Odd([self.x,self.z])])
+        for method in ['backtrack','forward-check','ac-lookahead']:
+            self.assertEqual(len(list(solve(space,method))),6)
+
+    def test_added_constraints(self):
+        #constraints added to the space after it was created are used
+        space = Space([self.x,self.z],[NonEqual(self.x,self.z)])
+        space.constraints.append(Less(self.x,self.z))
+        for method in ['backtrack','backjump','forward-check','ac-lookahead']:
+            self.assertEqual(len(list(solve(space,method))),6)
+            self.assertEqual(len(list(solve(space,method,ordering='mrv'))),6)
+        self.assertEqual(count_solutions(space),6)
+        space.constraints.pop(0)
+        self.assertEqual(len(list(solve(space))),6)
+        space.constraints.append(Equal(self.x,self.z))
+        self.assertEqual(len(list(solve(space))),0)
+        space = Space([self.x,self.z],[])
+        space.constraints.append(Less(self.x,self.z))
+        ac3(space)
+        self.assertEqual(set(space.domains['x'].iter_members()),set([1,2,3]))
+
+    def test_count(self):
+        space = Space([self.x,self.y],[])
+        self.assertEqual(count_solutions(space),12)
+        space = Space([self.x,self.y,self.z],[Less(self.x,self.z)])
+        for method in ['backtrack','forward-check','ac-lookahead']:
+            self.assertEqual(count_solutions(space,method),18)
+        space = Space([self.x,self.y,self.z],
+                      [Less(self.x,self.z),Domain(self.y,DiscreteSet(['a']))])
+        self.assertEqual(count_solutions(space,ordering=['z','y','x']),6)
+        space = Space([self.x,self.y],[FixedValue(self.x,2),
+                                       FixedValue(self.x,3)])
+        self.assertEqual(count_solutions(space),0)
+        variables, cnst = nary_queens(6)
+        self.assertEqual(count_solutions(Space(variables,[cnst])),4)
+
+    def test_count_large(self):
+        #far too many solutions to enumerate
+        variables = [DiscreteVariable(str(i),domain=DiscreteSet(range(10)))
+                     for i in range(30)]
+        space = Space(variables,[Less(variables[0],variables[1])])
+        self.assertEqual(count_solutions(space),45*10**28)
+
+    def test_components(self):
+        a = DiscreteVariable('a',domain=DiscreteSet([1,2]))
+        b = DiscreteVariable('b',domain=DiscreteSet([1,2,3]))
+        c = DiscreteVariable('c',domain=DiscreteSet([1,2]))
+        d = DiscreteVariable('d',domain=DiscreteSet([1,2,3]))
+        space = Space([a,b,c,d],[NonEqual(a,b),Domain(c,DiscreteSet([2]))])
+        comps = space.components()
+        self.assertEqual(len(comps),3)
+        self.assertEqual([sorted(comp.variables) for comp in comps],
+                         [['a','b'],['c'],['d']])
+        sols = list(solve(space,'forward-check',['d','c','b','a']))
+        self.assertEqual(len(sols),12)
+        keys = set(tuple(sorted(sol.items())) for sol in sols)
+        expected = set()
+        for va, vb, vd in product([1,2],[1,2,3],[1,2,3]):
+            if va != vb:
+                expected.add((('a',va),('b',vb),('c',2),('d',vd)))
+        self.assertEqual(keys,expected)
+
+    def test_components_order(self):
+        #with the variables of every component consecutive in the ordering,
+        #the solutions come in the same order as without decomposition
+        variables = [DiscreteVariable(n,domain=DiscreteSet([1,2,3]))
+                     for n in 'abcde']
+        a, b, c, d, e = variables
+        constraints = [NonEqual(a,b),Less(c,d)]
+        space = Space(variables,constraints)
+        joined = Space(variables,constraints + chain([b,c,e]))
+        for ordering in [['e','c','d','a','b'],['b','a','e','d','c']]:
+            for method in ['backtrack','forward-check','ac-lookahead']:
+                self.assertEqual(list(solve(space,method,ordering)),
+                                 list(solve(joined,method,ordering)))
+
+    def test_components_interleaved(self):
+        #components whose variables are interleaved in the ordering, or a
+        #value ordering, give the same order as a search of the whole space
+        rng = Random(2)
+        variables = [DiscreteVariable(n,domain=DiscreteSet([1,2,3]))
+                     for n in 'abcdef']
+        a, b, c, d, e, f = variables
+        space = Space(variables,[NonEqual(a,b),Less(c,d),NonEqual(e,f)])
+        for i in range(10):
+            ordering = [v.name for v in variables]
+            rng.shuffle(ordering)
+            for method, values in product(['backtrack','forward-check'],
+                                          [None,'lcv','phase','solution']):
+                search = _searcher(space,method,ordering,values,None,None)
+                self.assertEqual(list(solve(space,method,ordering,values)),
+                                 list(search.solutions({})))
+
+    def test_components_empty(self):
+        a = DiscreteVariable('a',domain=DiscreteSet([1,2]))
+        b = DiscreteVariable('b',domain=DiscreteSet([1]))
+        c = DiscreteVariable('c',domain=DiscreteSet([1]))
+        space = Space([a,b,c],[NonEqual(b,c)])
+        self.assertEqual(list(solve(space)),[])
+
+    def test_components_lazy(self):
+        #the product of many components is too large to enumerate
+        variables = []
+        constraints = []
+        for i in range(20):
+            v1 = DiscreteVariable('x%d' % i,domain=DiscreteSet(range(10)))
+            v2 = DiscreteVariable('y%d' % i,domain=DiscreteSet(range(10)))
+            variables += [v1,v2]
+            constraints.append(NonEqual(v1,v2))
+        space = Space(variables,constraints)
+        self.assertEqual(len(space.components()),20)
+        sols = solve(space)
+        first = next(sols)
+        second = next(sols)
+        self.assertEqual(len(first),40)
+        self.assertNotEqual(first,second)
+        self.assertEqual(count_solutions(space),90**20)
+
+    def test_tree(self):
+        #a star of less relations with a chain of inequalities attached
+        variables = [DiscreteVariable(str(i),domain=DiscreteSet(range(4)))
+                     for i in range(7)]
+        constraints = [Less(variables[0],variables[i]) for i in range(1,4)]
+        constraints.append(Domain(variables[1],DiscreteSet([1,2])))
+        for i in range(3,6):
+            constraints.append(NonEqual(variables[i],variables[i+1]))
+        space = Space(variables,constraints)
+        self.assertTrue(_tree(space) is not None)
+        sols = set(tuple(sorted(s.items())) for s in solve(space))
+        ordering = [v.name for v in variables]
+        expected = set(tuple(sorted(s.items())) for s in
+                       solve(space,ordering=ordering))
+        self.assertEqual(sols,expected)
+        self.assertEqual(count_solutions(space),len(expected))
+        #closing a cycle falls back to search
+        constraints.append(NonEqual(variables[6],variables[0]))
+        space = Space(variables,constraints)
+        self.assertTrue(_tree(space) is None)
+
+    def test_tree_empty(self):
+        a = DiscreteVariable('a',domain=DiscreteSet([1,2]))
+        b = DiscreteVariable('b',domain=DiscreteSet([1,2]))
+        c = DiscreteVariable('c',domain=DiscreteSet([1,2]))
+        space = Space([a,b,c],[Less(a,b),Less(b,c)])
+        self.assertEqual(list(solve(space)),[])
+        self.assertEqual(count_solutions(space),0)
+
+    def test_tree_large(self):
+        #a long chain is solved without backtracking
+        variables = [DiscreteVariable(str(i),domain=DiscreteSet(range(3)))
+                     for i in range(2000)]
+        constraints = [NonEqual(v1,v2) for v1, v2 in
+                       zip(variables[:-1],variables[1:])]
+        constraints.append(FixedValue(variables[-1],0))
+        space = Space(variables,constraints)
+        sol = next(solve(space))
+        self.assertEqual(sol['1999'],0)
+        self.assertTrue(all(sol[str(i)] != sol[str(i+1)] for i in range(1999)))
+        self.assertEqual(count_solutions(space),2**1999)
+
+class TestBudget(unittest.TestCase):
+    def setUp(self):
+        variables, cnst = nary_queens(8)
+        self.space = Space(variables,[cnst])
+
+    def test_finished(self):
+        budget = Budget()
+        self.assertEqual(len(list(solve(self.space,budget=budget))),92)
+        self.assertTrue(budget.finished)
+        self.assertEqual(budget.stopped,None)
+        self.assertEqual(budget.found,92)
+
+    def test_limit(self):
+        budget = Budget(limit=10)
+        sols = list(solve(self.space,'forward-check',budget=budget))
+        self.assertEqual(len(sols),10)
+        self.assertEqual(sols,list(solve(self.space,'forward-check'))[:10])
+        self.assertFalse(budget.finished)
+        self.assertEqual(budget.stopped,'limit')
+
+    def test_nodes(self):
+        budget = Budget(max_nodes=50)
+        sols = list(solve(self.space,budget=budget))
+        self.assertEqual(budget.stopped,'nodes')
+        self.assertEqual(budget.nodes,50)
+        self.assertTrue(len(sols) < 92)
+
+    def test_deadline(self):
+        budget = Budget(deadline=0)
+        self.assertEqual(list(solve(self.space,budget=budget)),[])
+        self.assertEqual(budget.stopped,'deadline')
+
+    def test_cancel(self):
+        budget = Budget()
+        sols = []
+        for sol in solve(self.space,budget=budget):
+            sols.append(sol)
+            budget.cancel()
+        self.assertEqual(len(sols),1)
+        self.assertEqual(budget.stopped,'cancelled')
+        self.assertFalse(budget.finished)
+
+    def test_components(self):
+        #the budget is shared by all components and the tree path
+        variables = [DiscreteVariable(str(i),domain=DiscreteSet(range(3)))
+                     for i in range(8)]
+        constraints = [NonEqual(variables[i],variables[i+1])
+                       for i in range(0,8,2)]
+        space = Space(variables,constraints)
+        budget = Budget(max_nodes=20)
+        list(solve(space,budget=budget))
+        self.assertEqual(budget.stopped,'nodes')
+        budget = Budget(limit=7)
+        self.assertEqual(len(list(solve(space,budget=budget))),7)
+        budget = Budget()
+        self.assertEqual(len(list(solve(space,budget=budget))),6**4)
+        self.assertTrue(budget.finished)
+
+class TestStatistics(unittest.TestCase):
+    def setUp(self):
+        variables, cnst = nary_queens(6)
+        self.space = Space(variables,[cnst])
+
+    def test_search(self):
+        for method in ['backtrack','backjump','forward-check','ac-lookahead']:
+            stats = Statistics()
+            sols = list(solve(self.space,method,stats=stats))
+            self.assertEqual(sols,list(solve(self.space,method)))
+            self.assertEqual(stats.solutions,4)
+            self.assertTrue(stats.nodes > 0)
+            self.assertTrue(stats.backtracks > 0)
+            self.assertTrue(stats.checks > 0)
+            self.assertTrue(stats.time >= stats.propagation_time)
+            self.assertTrue(stats.search_time() >= 0)
+            self.assertEqual(sum(l.nodes for l in stats.levels.values()),
+                             stats.nodes)
+            #the initial propagation of ac-lookahead happens at no node
+            self.assertTrue(sum(l.checks for l in stats.levels.values())
+                            <= stats.checks)
+            self.assertEqual(max(stats.levels),5)
+            if method in ['forward-check','ac-lookahead']:
+                self.assertTrue(stats.pruned > 0)
+            if method == 'ac-lookahead':
+                self.assertTrue(stats.revisions > 0)
+
+    def test_during_search(self):
+        stats = Statistics()
+        sols = solve(self.space,stats=stats)
+        next(sols)
+        nodes = stats.nodes
+        self.assertEqual(stats.solutions,1)
+        list(sols)
+        self.assertTrue(stats.nodes > nodes)
+
+    def test_propagate(self):
+        x = DiscreteVariable('x',domain=DiscreteSet([1,2,3]))
+        y = DiscreteVariable('y',domain=DiscreteSet([1,2,3]))
+        for method in ['ac3','ac2001']:
+            space = Space([x,y],[Less(x,y)])
+            stats = Statistics()
+            checks = propagate(space,method,stats)
+            self.assertEqual(stats.checks,checks)
+            self.assertEqual(stats.pruned,2)
+            self.assertTrue(stats.revisions >= 2)
+
+class TestRestarts(unittest.TestCase):
+    def setUp(self):
+        variables, cnst = nary_queens(8)
+        self.space = Space(variables,[cnst])
+
+    def test_luby(self):
+        self.assertEqual([_luby(i) for i in range(15)],
+                         [1,1,2,1,1,2,4,1,1,2,1,1,2,4,8])
+
+    def test_solution(self):
+        for method in ['backtrack','backjump','forward-check','ac-lookahead']:
+            for restarts in ['luby','geometric']:
+                sol = restart_solve(self.space,method,restarts=restarts,
+                                    cutoff=2,seed=1)
+                self.assertTrue(self.space.satisfied(sol))
+
+    def test_seed(self):
+        sol1 = restart_solve(self.space,cutoff=1,seed=3)
+        sol2 = restart_solve(self.space,cutoff=1,seed=3)
+        self.assertEqual(sol1,sol2)
+
+    def test_static(self):
+        ordering = [str(i) for i in range(8)]
+        sol = restart_solve(self.space,'forward-check',ordering,cutoff=1,
+                            nogoods=NogoodStore())
+        self.assertTrue(self.space.satisfied(sol))
+
+    def test_unsatisfiable(self):
+        #four pigeons in three holes
+        variables = [DiscreteVariable(str(i),domain=DiscreteSet(range(3)))
+                     for i in range(4)]
+        space = Space(variables,[AllDifferent(variables)])
+        budget = Budget()
+        stats = Statistics()
+        self.assertEqual(restart_solve(space,cutoff=1,budget=budget,
+                                       stats=stats),None)
+        self.assertTrue(budget.finished)
+        self.assertEqual(stats.solutions,0)
+
+    def test_budget(self):
+        budget = Budget(max_nodes=5)
+        self.assertEqual(restart_solve(self.space,cutoff=1,budget=budget),None)
+        self.assertEqual(budget.stopped,'nodes')
+        self.assertFalse(budget.finished)
+
+    def test_unknown(self):
+        self.assertRaises(ValueError,
+                          lambda: restart_solve(self.space,restarts='foo'))
+
+class TestMinConflicts(unittest.TestCase):
+    def test_queens(self):
+        space = queens(10)
+        for seed in range(3):
+            sols = list(solve(space,'min-conflicts',seed=seed))
+            self.assertEqual(len(sols),1)
+            self.assertTrue(space.satisfied(sols[0]))
+
+    def test_nary(self):
+        variables, cnst = nary_queens(8)
+        space = Space(variables,[cnst])
+        sol = next(solve(space,'min-conflicts',seed=1))
+        self.assertTrue(space.satisfied(sol))
+
+    def test_large(self):
+        #colouring of a random graph with a hidden solution
+        rng = Random(0)
+        variables = [DiscreteVariable(str(i),domain=DiscreteSet(range(3)))
+                     for i in range(1000)]
+        hidden = [rng.randrange(3) for var in variables]
+        constraints = []
+        while len(constraints) < 1500:
+            i, j = rng.randrange(1000), rng.randrange(1000)
+            if hidden[i] != hidden[j]:
+                constraints.append(NonEqual(variables[i],variables[j]))
+        space = Space(variables,constraints)
+        stats = Statistics()
+        sol = next(solve(space,'min-conflicts',seed=2,stats=stats))
+        self.assertTrue(space.satisfied(sol))
+        self.assertEqual(stats.solutions,1)
+        #a step only evaluates the constraints of one variable
+        self.assertTrue(stats.checks < 50*stats.nodes + 2*len(constraints))
+
+    def test_seed(self):
+        space = queens(8)
+        self.assertEqual(list(solve(space,'min-conflicts',seed=3)),
+                         list(solve(space,'min-conflicts',seed=3)))
+
+    def test_unsatisfiable(self):
+        #four pigeons in three holes
+        variables = [DiscreteVariable(str(i),domain=DiscreteSet(range(3)))
+                     for i in range(4)]
+        space = Space(variables,[NonEqual(v1,v2) for v1 in variables
+                                 for v2 in variables if v1.name < v2.name])
+        budget = Budget(max_nodes=200)
+        self.assertEqual(list(solve(space,'min-conflicts',budget=budget)),[])
+        self.assertEqual(budget.stopped,'nodes')
+        #empty domains are detected without search
+        space = Space(variables,[Domain(variables[0],DiscreteSet([5]))])
+        self.assertEqual(list(solve(space,'min-conflicts')),[])
+
+    def test_components(self):
+        a, b, c, d = [DiscreteVariable(n,domain=DiscreteSet([1,2,3]))
+                      for n in 'abcd']
+        space = Space([a,b,c,d],[Less(a,b),Less(b,c)])
+        sols = list(solve(space,'min-conflicts',seed=4))
+        self.assertEqual(len(sols),1)
+        self.assertEqual((sols[0]['a'],sols[0]['b'],sols[0]['c']),(1,2,3))
+        self.assertTrue(sols[0]['d'] in [1,2,3])
+
+class TestSymmetries(unittest.TestCase):
+    def setUp(self):
+        #colouring of a cycle of length five with interchangeable colours
+        self.variables = [DiscreteVariable(str(i),domain=DiscreteSet(range(3)))
+                          for i in range(5)]
+        self.constraints = [NonEqual(self.variables[i],self.variables[i-1])
+                            for i in range(5)]
+
+    def key(self,sol):
+        return tuple(sol[var.name] for var in self.variables)
+
+    def test_value_symmetry(self):
+        space = Space(self.variables,self.constraints)
+        all_sols = set(self.key(sol) for sol in solve(space))
+        self.assertEqual(len(all_sols),30)
+        space.add_value_symmetry(range(3))
+        for method in ['backtrack','backjump','forward-check','ac-lookahead']:
+            sols = list(solve(space,method))
+            self.assertEqual(len(sols),5)
+            #the colours are introduced in increasing order
+            self.assertTrue(all(sol['0'] == 0 for sol in sols))
+            expanded = [self.key(sol) for sol in solve(space,method,expand=True)]
+            self.assertEqual(len(expanded),30)
+            self.assertEqual(set(expanded),all_sols)
+
+    def test_variable_symmetry(self):
+        space = Space(self.variables[:3],[AllDifferent(self.variables[:3])])
+        space.add_variable_symmetry(['0','1','2'])
+        sols = list(solve(space))
+        self.assertEqual(sols,[{'0' : 0, '1' : 1, '2' : 2}])
+        sols = list(solve(space,ordering=['2','1','0']))
+        self.assertEqual(sols,[{'0' : 2, '1' : 1, '2' : 0}])
+        self.assertEqual(len(list(solve(space,expand=True))),6)
+
+    def test_combined(self):
+        space = Space(self.variables[:3],[AllDifferent(self.variables[:3])])
+        space.add_variable_symmetry(['0','1','2'])
+        space.add_value_symmetry(range(3))
+        self.assertEqual(len(list(solve(space))),1)
+        self.assertEqual(len(list(solve(space,expand=True))),6)
+        self.assertRaises(ValueError,lambda: list(solve(space,ordering='mrv')))
+
+    def test_components(self):
+        #the symmetries join the components they span
+        space = Space(self.variables,self.constraints[1:3])
+        space.add_value_symmetry(range(3),['0','1','3'])
+        space.add_variable_symmetry(['0','2'])
+        syms = dict((tuple(s.variables),s) for s in space.components())
+        self.assertEqual(sorted(syms),[('0','1','2','3'),('4',)])
+        self.assertEqual(syms[('0','1','2','3')].value_symmetries,
+                         [((0,1,2),('0','1','3'))])
+        self.assertEqual(syms[('0','1','2','3')].variable_symmetries,
+                         [('0','2')])
+        self.assertEqual(syms[('4',)].value_symmetries,[])
+
+    def test_unconstrained(self):
+        #a value permutation acts on all variables at once, even if they
+        #are not linked by constraints
+        variables = [DiscreteVariable(str(i),domain=DiscreteSet(range(4)))
+                     for i in range(3)]
+        space = Space(variables,[])
+        space.add_value_symmetry([1,2,3])
+        self.assertEqual(len(list(solve(space))),15)
+        expanded = set(tuple(sorted(sol.items()))
+                       for sol in solve(space,expand=True))
+        self.assertEqual(len(expanded),64)
+        space.add_variable_symmetry(['0','1','2'])
+        #of the 7 classes, one is found twice as [1,1,2] and [1,2,2]
+        self.assertEqual(len(list(solve(space))),8)
+        expanded = [tuple(sorted(sol.items()))
+                    for sol in solve(space,expand=True)]
+        self.assertEqual(len(expanded),64)
+        self.assertEqual(len(set(expanded)),64)
+
+    def test_unknown(self):
+        space = Space(self.variables,self.constraints)
+        self.assertRaises(ValueError,lambda: space.add_value_symmetry([0],['x']))
+        self.assertRaises(ValueError,lambda: space.add_variable_symmetry(['x']))
+
+    def test_nogoods(self):
+        #nogoods learned under the chain 0 <= 1 <= 2 cut off the solutions
+        #admitted by the chain 2 <= 1 <= 0
+        variables = [DiscreteVariable(str(i),domain=DiscreteSet(range(4)))
+                     for i in range(3)]
+        space = Space(variables,[AllDifferent(variables)])
+        space.add_variable_symmetry(['0','1','2'])
+        nogoods = NogoodStore()
+        sols = list(solve(space,'backjump',['0','1','2'],nogoods=nogoods))
+        self.assertEqual(len(sols),4)
+        self.assertTrue(len(nogoods) > 0)
+        self.assertRaises(ValueError,lambda: list(
+            solve(space,'backjump',['2','1','0'],nogoods=nogoods)))
+        self.assertRaises(ValueError,lambda: restart_solve(
+            space,'backjump',['2','1','0'],nogoods=nogoods))
+        sols = list(solve(space,'backjump',['0','1','2'],nogoods=nogoods,
+                          expand=True))
+        self.assertEqual(len(sols),24)
+        #nogoods learned without symmetries are valid under any breaking
+        nogoods = NogoodStore()
+        plain = Space(variables,[AllDifferent(variables)])
+        self.assertEqual(len(list(solve(plain,'backjump',nogoods=nogoods))),24)
+        sols = list(solve(space,'backjump',['2','1','0'],nogoods=nogoods))
+        self.assertEqual(len(sols),4)
+        self.assertTrue(all(sol['2'] < sol['1'] < sol['0'] for sol in sols))
+
+class TestNogoodStore(unittest.TestCase):
+    def test_find(self):
+        nogoods = NogoodStore()
+        nogoods.add({'x' : 1, 'y' : 2})
+        self.assertEqual(len(nogoods),1)
+        self.assertEqual(nogoods.find({'x' : 1, 'y' : 2, 'z' : 3},'y'),
+                         frozenset([('x',1),('y',2)]))
+        self.assertEqual(nogoods.find({'x' : 1, 'y' : 2, 'z' : 3},'z'),None)
+        self.assertEqual(nogoods.find({'x' : 2, 'y' : 2},'y'),None)
+        self.assertEqual(nogoods.find({'y' : 2},'y'),None)
+
+    def test_eviction(self):
+        nogoods = NogoodStore(capacity=2)
+        nogoods.add({'x' : 1})
+        nogoods.add({'x' : 2})
+        #using a nogood protects it from eviction
+        self.assertTrue(nogoods.find({'x' : 1},'x') is not None)
+        nogoods.add({'x' : 3})
+        self.assertEqual(len(nogoods),2)
+        self.assertTrue(nogoods.find({'x' : 1},'x') is not None)
+        self.assertTrue(nogoods.find({'x' : 2},'x') is None)
+        self.assertTrue(nogoods.find({'x' : 3},'x') is not None)
+
 class TestNodeConsistencyReduction(unittest.TestCase):
     def setUp(self):
         self.x = DiscreteVariable('x',domain=DiscreteSet([1,2,3,5]))
@@ -112,3 +853,324 @@ class TestArcConsistencyReduction(unittest.TestCase):
         self.assertFalse(_binary(space,cnst,'x','y'))
         self.assertTrue(_binary(space,cnst,'y','x'))
         self.assertEqual(len(space.domains['y'].elements),2)
+
+class TestAC3(unittest.TestCase):
+    def setUp(self):
+        self.variables = []
+        for name in 'wxyz':
+            domain = DiscreteSet([1,2,3,4])
+            self.variables.append(DiscreteVariable(name,domain=domain))
+
+    def test_chain(self):
+        w,x,y,z = self.variables
+        space = Space(self.variables,[Less(z,y),Less(y,x),Less(x,w)])
+        ac3(space)
+        self.assertEqual(space.domains['w'].elements,frozenset([4]))
+        self.assertEqual(space.domains['x'].elements,frozenset([3]))
+        self.assertEqual(space.domains['y'].elements,frozenset([2]))
+        self.assertEqual(space.domains['z'].elements,frozenset([1]))
+
+    def test_unconstrained(self):
+        w,x,y,z = self.variables
+        space = Space(self.variables,[Less(w,x)])
+        ac3(space)
+        self.assertEqual(space.domains['w'].elements,frozenset([1,2,3]))
+        self.assertEqual(space.domains['x'].elements,frozenset([2,3,4]))
+        self.assertEqual(len(space.domains['y'].elements),4)
+        self.assertEqual(len(space.domains['z'].elements),4)
+
+    def test_requeue(self):
+        #narrowing y has to requeue the arc from x to y, which the original
+        #implementation missed, leaving 0 in the domain of x
+        x = DiscreteVariable('x',domain=DiscreteSet([0,2]))
+        y = DiscreteVariable('y',domain=DiscreteSet([0,1,2,3]))
+        z = DiscreteVariable('z',domain=DiscreteSet([0,1]))
+        space = Space([x,y,z],[NonEqual(x,y),Less(y,z)])
+        ac3(space)
+        self.assertEqual(space.domains['x'].elements,frozenset([2]))
+        self.assertEqual(space.domains['y'].elements,frozenset([0]))
+        self.assertEqual(space.domains['z'].elements,frozenset([1]))
+
+    def test_index(self):
+        w,x,y,z = self.variables
+        cnst1 = Less(w,x)
+        cnst2 = AllDifferent([x,y,z])
+        space = Space(self.variables,[cnst1,cnst2])
+        self.assertEqual(space.var_constraints['w'],[cnst1])
+        self.assertEqual(space.var_constraints['x'],[cnst1,cnst2])
+        self.assertEqual(space.var_constraints['z'],[cnst2])
+
+class TestAC2001(unittest.TestCase):
+    def setUp(self):
+        self.variables, self.cnst = nary_queens(8)
+
+    def test_same_domains(self):
+        fixed = FixedValue(self.variables[0],(3,0))
+        space1 = Space(self.variables,[self.cnst,fixed])
+        space2 = Space(self.variables,[self.cnst,fixed])
+        checks1 = ac3(space1)
+        checks2 = ac2001(space2)
+        for vname in space1.variables:
+            self.assertEqual(space1.domains[vname].elements,
+                             space2.domains[vname].elements)
+        self.assertEqual(len(space2.domains['1'].elements),5)
+        self.assertTrue(checks2 < checks1)
+
+    def test_propagate(self):
+        fixed = FixedValue(self.variables[0],(3,0))
+        space1 = Space(self.variables,[self.cnst,fixed])
+        space2 = Space(self.variables,[self.cnst,fixed])
+        self.assertEqual(propagate(space1,method='ac2001'),ac2001(space2))
+        space = Space(self.variables,[self.cnst,fixed])
+        self.assertRaises(ValueError,lambda: propagate(space,method='foo'))
+
+class TestPC2(unittest.TestCase):
+    def test_triangle(self):
+        #arc consistent, but not path consistent
+        variables = [DiscreteVariable(n,domain=DiscreteSet([1,2]))
+                     for n in 'xyz']
+        x, y, z = variables
+        space = Space(variables,[NonEqual(x,y),NonEqual(y,z),NonEqual(x,z)])
+        ac3(space)
+        self.assertEqual(space.domains['x'].elements,frozenset([1,2]))
+        pc2(space)
+        self.assertTrue(any(len(space.domains[v].elements) == 0
+                            for v in 'xyz'))
+
+    def test_relation(self):
+        variables = [DiscreteVariable(n,domain=DiscreteSet([1,2]))
+                     for n in 'xyz']
+        x, y, z = variables
+        space = Space(variables,[LessEqual(x,y),LessEqual(y,z)])
+        sols = list(solve(space))
+        stats = Statistics()
+        checks = pc2(space,stats)
+        self.assertTrue(checks > 0)
+        self.assertEqual(stats.checks,checks)
+        #x = 2 and z = 1 is removed by a new relation
+        self.assertEqual(stats.pairs,1)
+        self.assertEqual(stats.pruned,0)
+        self.assertEqual(len(space.constraints),3)
+        self.assertFalse(space.constraints[2].satisfied({'x' : 2, 'z' : 1}))
+        self.assertEqual(len(space.var_constraints['x']),2)
+        self.assertEqual(list(solve(space)),sols)
+
+    def test_propagate(self):
+        variables, cnst = nary_queens(5)
+        space1 = Space(variables,[cnst,FixedValue(variables[0],(1,0))])
+        space2 = Space(variables,[cnst,FixedValue(variables[0],(1,0))])
+        self.assertEqual(propagate(space1,method='pc2'),pc2(space2))
+        for vname in space1.variables:
+            self.assertEqual(space1.domains[vname].elements,
+                             space2.domains[vname].elements)
+        space = Space([RealVariable('a')],[])
+        self.assertRaises(ValueError,lambda: pc2(space))
+
+class TestSAC(unittest.TestCase):
+    def setUp(self):
+        #a = 3 leaves only the value 1 for both b and c
+        self.variables = [DiscreteVariable('a',domain=DiscreteSet([0,3]))]
+        for name in 'bc':
+            domain = DiscreteSet([1,3])
+            self.variables.append(DiscreteVariable(name,domain=domain))
+        self.constraints = [NonEqual(v1,v2) for v1 in self.variables
+                            for v2 in self.variables if v1.name < v2.name]
+
+    def test_singleton(self):
+        space = Space(self.variables,self.constraints)
+        ac3(space)
+        self.assertEqual(space.domains['a'].elements,frozenset([0,3]))
+        stats = Statistics()
+        checks = sac(space,stats)
+        self.assertEqual(stats.checks,checks)
+        self.assertEqual(stats.pruned,1)
+        self.assertEqual(space.domains['a'].elements,frozenset([0]))
+        for vname in 'bc':
+            self.assertEqual(space.domains[vname].elements,frozenset([1,3]))
+
+    def test_no_solution(self):
+        self.variables[0] = DiscreteVariable('a',domain=DiscreteSet([3]))
+        space = Space(self.variables,self.constraints)
+        sac(space)
+        self.assertTrue(any(len(space.domains[v].elements) == 0
+                            for v in 'abc'))
+
+    def test_propagate(self):
+        space1 = Space(self.variables,self.constraints)
+        space2 = Space(self.variables,self.constraints)
+        self.assertEqual(propagate(space1,method='sac'),sac(space2))
+        self.assertEqual(space1.domains['a'].elements,frozenset([0]))
+
+class TestBranchAndPrune(unittest.TestCase):
+    def setUp(self):
+        self.x = RealVariable('x',domain=IntervalSet([Interval.closed(0,10)]))
+        self.y = RealVariable('y',domain=IntervalSet([Interval.closed(0,3)]))
+        self.z = RealVariable('z',domain=IntervalSet([Interval.closed(2,20)]))
+
+    def test_bounds(self):
+        space = Space([self.x,self.y,self.z],
+                      [Less(self.x,self.y),Equal(self.z,self.x)])
+        stats = Statistics()
+        self.assertEqual(propagate(space,'bounds',stats),stats.revisions)
+        self.assertEqual(str(space.domains['x']),'[2,3)')
+        self.assertEqual(str(space.domains['y']),'(2,3]')
+        self.assertEqual(str(space.domains['z']),'[2,3)')
+        space = Space([self.x,self.y],[GreaterEqual(self.y,self.x)])
+        bounds_consistency(space)
+        self.assertEqual(str(space.domains['x']),'[0,3]')
+        self.assertEqual(str(space.domains['y']),'[0,3]')
+
+    def test_boxes(self):
+        space = Space([self.x,self.y],[Less(self.x,self.y)])
+        boxes = list(solve(space,'branch-and-prune',precision=0.1))
+        self.assertTrue(len(boxes) > 1)
+        for box in boxes:
+            lower1, upper1 = box['x'].ints[0].bounds[0], box['x'].ints[-1].bounds[1]
+            lower2, upper2 = box['y'].ints[0].bounds[0], box['y'].ints[-1].bounds[1]
+            self.assertTrue(0 <= lower1 and upper1 <= 3)
+            self.assertTrue(0 <= lower2 and upper2 <= 3)
+            #either all points are solutions, or the box is small
+            self.assertTrue(upper1 <= lower2 or
+                            (upper1 - lower1 <= 0.1 and upper2 - lower2 <= 0.1))
+        #every solution is covered by a box
+        rng = Random(1)
+        for i in range(200):
+            x, y = rng.uniform(0,3), rng.uniform(0,3)
+            if x < y:
+                self.assertTrue(any(x in box['x'] and y in box['y']
+                                    for box in boxes))
+
+    def test_equal(self):
+        space = Space([self.x,self.z],[Equal(self.z,self.x)])
+        boxes = list(solve(space,'branch-and-prune',precision=0.5))
+        self.assertTrue(len(boxes) > 1)
+        for box in boxes:
+            self.assertEqual(str(box['x']),str(box['z']))
+
+    def test_unsatisfiable(self):
+        z = RealVariable('z',domain=IntervalSet([Interval.closed(5,8)]))
+        space = Space([self.y,z],[Greater(self.y,z)])
+        self.assertEqual(list(solve(space,'branch-and-prune')),[])
+
+    def test_components(self):
+        w = RealVariable('w',domain=IntervalSet([Interval.closed(0,1)]))
+        space = Space([self.x,self.y,self.z,w],
+                      [LessEqual(self.x,self.y),Greater(self.z,w)])
+        budget = Budget(limit=5)
+        boxes = list(solve(space,'branch-and-prune',precision=0.5,
+                           budget=budget))
+        self.assertEqual(len(boxes),5)
+        self.assertTrue(all(len(box) == 4 for box in boxes))
+        #z > w holds everywhere, so the component is not bisected
+        self.assertEqual(str(boxes[0]['z']),'[2,20]')
+
+    def test_errors(self):
+        space = Space([self.x,RealVariable('a')],
+                      [Less(self.x,RealVariable('a'))])
+        self.assertRaises(ValueError,
+                          lambda: list(solve(space,'branch-and-prune')))
+        space = Space([self.x,self.y],[Less(self.x,self.y)])
+        self.assertRaises(ValueError,
+                          lambda: list(solve(space,'branch-and-prune',
+                                             precision=0)))
+        a = DiscreteVariable('a',domain=DiscreteSet([1,2]))
+        space = Space([self.x,a],[])
+        self.assertRaises(ValueError,lambda: bounds_consistency(space))
+
+class SumObjective(Objective):
+    """
+    Sum of the values of variables, without bounds for partial labelings
+    """
+    def value(self,lab):
+        return sum(lab[vname] for vname in self.vnames)
+
+class TestOptimize(unittest.TestCase):
+    def setUp(self):
+        self.space = queens(7)
+        variables = list(self.space.variables.values())
+        self.objective = LinearObjective(
+            dict((v,(-1)**i*(i+1)) for i,v in enumerate(variables)),3)
+        self.values = [self.objective.value(sol) for sol in solve(self.space)]
+
+    def test_bounds(self):
+        a = DiscreteVariable('a',domain=DiscreteSet([1,2,3]))
+        b = DiscreteVariable('b',domain=DiscreteSet([1,2,3]))
+        objective = LinearObjective({a : 2, b : -1},1)
+        domains = {'a' : [1,3], 'b' : [2,3]}
+        self.assertEqual(objective.value({'a' : 3, 'b' : 2}),5)
+        self.assertEqual(objective.bounds(domains,{}),(0,5))
+        self.assertEqual(objective.bounds(domains,{'a' : 1}),(0,1))
+        objective = SumObjective([a,b])
+        self.assertEqual(objective.bounds(domains,{'a' : 1}),
+                         (float('-inf'),float('inf')))
+        self.assertEqual(objective.bounds(domains,{'a' : 1, 'b' : 3}),(4,4))
+
+    def test_minimize(self):
+        res = [self.objective.value(sol)
+               for sol in optimize(self.space,self.objective)]
+        self.assertEqual(res[-1],min(self.values))
+        for value1, value2 in zip(res[:-1],res[1:]):
+            self.assertTrue(value2 < value1)
+
+    def test_maximize(self):
+        res = [self.objective.value(sol)
+               for sol in optimize(self.space,self.objective,'max')]
+        self.assertEqual(res[-1],max(self.values))
+        for value1, value2 in zip(res[:-1],res[1:]):
+            self.assertTrue(value2 > value1)
+
+    def test_methods(self):
+        for method, ordering in product(['backtrack','backjump',
+                                         'forward-check','ac-lookahead'],
+                                        [None,'mrv','dom/wdeg']):
+            sols = list(optimize(self.space,self.objective,method=method,
+                                 ordering=ordering))
+            self.assertTrue(self.space.satisfied(sols[-1]))
+            self.assertEqual(self.objective.value(sols[-1]),
+                             min(self.values))
+
+    def test_pruning(self):
+        full = Statistics()
+        list(solve(self.space,'forward-check',
+                   ordering=list(self.space.variables),stats=full))
+        stats = Statistics()
+        sols = list(optimize(self.space,self.objective,
+                             method='forward-check',stats=stats))
+        self.assertEqual(stats.solutions,len(sols))
+        self.assertTrue(stats.nodes < full.nodes)
+        #without bounds, the whole tree is searched
+        objective = SumObjective(self.space.variables.values())
+        stats = Statistics()
+        sols = list(optimize(self.space,objective,method='forward-check',
+                             stats=stats))
+        self.assertEqual(stats.nodes,full.nodes)
+        self.assertEqual(objective.value(sols[-1]),
+                         min(objective.value(sol) for sol in solve(self.space)))
+
+    def test_budget(self):
+        budget = Budget(limit=2)
+        sols = list(optimize(self.space,self.objective,budget=budget))
+        self.assertEqual(len(sols),2)
+        self.assertEqual(budget.stopped,'limit')
+        self.assertFalse(budget.finished)
+        budget = Budget(max_nodes=10**6)
+        sols = list(optimize(self.space,self.objective,budget=budget))
+        self.assertTrue(budget.finished)
+        self.assertEqual(budget.found,len(sols))
+
+    def test_unsatisfiable(self):
+        a = DiscreteVariable('a',domain=DiscreteSet([1,2]))
+        b = DiscreteVariable('b',domain=DiscreteSet([1,2]))
+        space = Space([a,b],[Less(a,b),Greater(a,b)])
+        objective = LinearObjective({a : 1, b : 1})
+        self.assertEqual(list(optimize(space,objective)),[])
+
+    def test_errors(self):
+        self.assertRaises(ValueError,lambda: list(
+            optimize(self.space,self.objective,'best')))
+        self.assertRaises(ValueError,lambda: list(
+            optimize(self.space,self.objective,method='min-conflicts')))
+        x = RealVariable('x',domain=IntervalSet([Interval.closed(0,1)]))
+        space = Space([x],[])
+        self.assertRaises(ValueError,lambda: list(
+            optimize(space,LinearObjective({x : 1}))))